@@ -1,57 +1,172 @@
-import os, glob, sys, csv
-from os import listdir
-import grouper, plotter
-import multimetric.multimetric as mm
-
-            
-#####
-# main()
-#
-# The main control sequence for the whole Analyzer project
-# Needs exactly one command line argument, the name of the directory where all the data is located.
-# Will write out data in the folder <directory>-analysis/. Overwrites if it existed.
-
-def main():
-    if len(sys.argv) != 2:
-        print('Wrong number of arguments to Analyzer')
-        print('Usage: Analyzer <directory>')
-        print('<directory> is the path to the data directory')
-        print('All output will be saved in the directory <directory>-analysis>')
-        exit()
-
-    dir = sys.argv[1]
-    
-    if not os.path.isdir(dir):
-        print('Error:: Directory does not exist: \"' + dir + '\"')
-        exit()
-
-    print('Starting Analyzer on the directory: ' + dir)
-    
-    directory_contents = os.listdir(dir) # All subdirectories in target base directory, each contains a round of exercise submissions
-    round_list = []
-
-    for item in directory_contents: # Each subdirectory contains one round of submissions
-        if os.path.isdir(dir + '/' + item):
-            round_list.append(item)
-
-    grouper.create_dirs(dir,round_list) # Build the directory structure for writing the result files
-    
-    print('Analyzing round: ')
-    for i,round in enumerate(round_list): # Run the sorter for every round of exercises
-        print('... ' + round)
-        sorted_rounds = grouper.grouper(dir,round,i) # grouper.grouper also prints out statistical data about submission numbers to stdout TODO: to an excel file
-        grouper.sort_to_files(dir,sorted_rounds,round)
-        
-        # Run multimetric for each result file 
-        directory = dir + '-analysis/metrics/' + round + '/filelists/'
-        metric_input_files = os.listdir(directory)
-        for file in metric_input_files:
-            pathed_filename = directory + file
-            mm.mm_interface(pathed_filename)
-
-    # Plot everything!
-    plotter.plotter(dir + '-analysis')
-    print('Analyzer done. Results are found in the directory ' + dir + '-analysis/')
-    
-if __name__ == "__main__":
+import os, glob, csv, argparse
+import multiprocessing as mp
+from os import listdir
+import grouper, plotter, manifest, resultstore, summary
+import multimetric.multimetric as mm
+
+#####
+# ArgParser()
+#
+# Parses the command line of the Analyzer
+
+def ArgParser():
+    parser = argparse.ArgumentParser(prog='Analyzer', description='Static analysis of programming exercise submissions',
+                                     epilog='All output will be saved in the directory <directory>-analysis')
+    parser.add_argument('directory', help='the path to the data directory')
+    parser.add_argument('--incremental', default=False, action='store_true',
+                        help='only reprocess fail groups and plots whose inputs changed since the previous run')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of processes grouping the rounds and calculating the metrics of the whole course (default: %(default)s)')
+    parser.add_argument('--plot-jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of processes drawing the plots (default: %(default)s)')
+    parser.add_argument('--force-plots', default=False, action='store_true',
+                        help='draw all plots, also those whose data did not change since they were drawn')
+    parser.add_argument('--compact', default=False, action='store_true',
+                        help='write the metrics results without indentation, faster and smaller for large fail groups')
+    parser.add_argument('--engine', choices=['tokens', 'ast'], default='tokens',
+                        help='compute the metrics of Python submissions from the token stream or from the syntax tree (default: %(default)s)')
+    parser.add_argument('--scope-depth', type=int, default=0,
+                        help='with --engine ast, add the metrics of classes and functions nested up to this depth to the results, 0 disables them')
+    parser.add_argument('--language', default=None,
+                        help='parse all submissions with the lexer of this language (e.g. Python) instead of picking one by filename')
+    parser.add_argument('--cache-dir', default=None,
+                        help='directory of the multimetric result cache (default: ~/.cache/multimetric)')
+    parser.add_argument('--no-cache', default=False, action='store_true',
+                        help='calculate the metrics of every submission again instead of reading or writing the result cache')
+    parser.add_argument('--filelists', default=False, action='store_true',
+                        help='also write the submissions of every fail group into <directory>-analysis/metrics/<round>/filelists/, for debugging or further analysis')
+    parser.add_argument('--tests', metavar='ROUND=N', action='append', default=[],
+                        help='the amount of unit tests of a round, otherwise the longest unit test result in the CSV decides. Can be repeated')
+    args = parser.parse_args()
+    tests = {}
+    for item in args.tests:
+        round, _, count = item.rpartition('=')
+        if not round or not count.isdigit():
+            parser.error('--tests expects ROUND=N, got \"' + item + '\"')
+        tests[round] = int(count)
+    args.tests = tests
+    return args
+
+#####
+# result_filename(dir,round,group)
+#
+# dir       : The directory path of the main data
+# round     : The name of the round
+# group     : Name of a fail group, see grouper.fail_groups
+#
+# Returns the name of the result file multimetric writes for the fail group
+
+def result_filename(dir,round,group):
+    return dir + '-analysis/metrics/' + round + '/results/' + group + '-results.json'
+
+#####
+# remove_stale(directory,keep)
+#
+# directory : A directory of filelists or results
+# keep      : The files produced by this run
+#
+# Removes files left over from previous runs, e.g. fail groups that no longer have submissions
+
+def remove_stale(directory,keep):
+    for file in os.listdir(directory):
+        if directory + file not in keep:
+            os.remove(directory + file)
+
+#####
+# main()
+#
+# The main control sequence for the whole Analyzer project
+# Needs exactly one positional command line argument, the name of the directory where all the data is located.
+# Will write out data in the folder <directory>-analysis/. Overwrites if it existed.
+#
+# With --incremental, a manifest of the previous run is kept in <directory>-analysis/manifest.json. A fail group
+# is only run through multimetric if its list of submissions or any of the submission files changed, or if the results
+# of the previous run were written by another version of the Analyzer or multimetric or with other options.
+# Only the rounds with new results are plotted again.
+#
+# All rounds are grouped first, with --jobs processes working on different rounds at the same time. The summary of
+# the submission numbers is written once all rounds are done. Then the submissions of every fail group that has to be
+# processed go into a single multimetric run over the whole course, so one process pool is started instead of one per group.
+# The fail groups are handed from the grouper to multimetric as lists in memory. With --filelists they are also written
+# into text files, which nothing in the Analyzer reads back.
+
+def main():
+    args = ArgParser()
+    dir = args.directory
+    
+    if not os.path.isdir(dir):
+        print('Error:: Directory does not exist: \"' + dir + '\"')
+        exit()
+
+    print('Starting Analyzer on the directory: ' + dir)
+    
+    directory_contents = os.listdir(dir) # All subdirectories in target base directory, each contains a round of exercise submissions
+    round_list = []
+
+    for item in directory_contents: # Each subdirectory contains one round of submissions
+        if os.path.isdir(dir + '/' + item):
+            round_list.append(item)
+
+    grouper.create_dirs(dir,round_list) # Build the directory structure for writing the result files
+
+    old_manifest = manifest.load_manifest(dir + '-analysis') if args.incremental else {'rounds': {}}
+    new_manifest = {'rounds': {}}
+    changed_rounds = []
+    # The results of a fail group also depend on these, results written with others are not reused
+    settings = {'analyzer': manifest.VERSION, 'multimetric': mm.mm_version(), 'compact': args.compact,
+                'engine': args.engine, 'scope_depth': args.scope_depth, 'language': args.language}
+    pending = {} # Result file -> submissions, for the fail groups that have to be run through multimetric
+    summaries = [] # Submission numbers of every round
+    
+    print('Analyzing round: ')
+    work = [(dir,round,args.tests.get(round),args.filelists) for round in round_list]
+    if args.jobs > 1 and len(work) > 1: # Rounds are independent, group them all at once
+        with mp.Pool(processes=min(args.jobs,len(work))) as pool:
+            grouped = pool.starmap(grouper.group_round, work)
+    else:
+        grouped = [grouper.group_round(*x) for x in work]
+
+    for round,(fail_groups,round_summary) in zip(round_list,grouped): # Check which fail groups of each round changed
+        print('... ' + round)
+        summaries.append(round_summary)
+        filelists = [dir + '-analysis/metrics/' + round + '/filelists/' + x + '.txt' for x in fail_groups] if args.filelists else []
+        results = [result_filename(dir,round,x) for x in fail_groups]
+        remove_stale(dir + '-analysis/metrics/' + round + '/filelists/', filelists)
+        remove_stale(dir + '-analysis/metrics/' + round + '/results/', results)
+
+        old_groups = old_manifest['rounds'].get(round, {}).get('groups', {})
+        groups = {}
+        changed = set(old_groups) != set(fail_groups)
+        
+        # Collect the groups to run multimetric for
+        for (name,files),result in zip(fail_groups.items(),results):
+            groups[name] = manifest.fingerprint_group(dir,files,settings)
+            if old_groups.get(name) == groups[name] and os.path.exists(result):
+                continue # Nothing changed since the previous run
+            pending[result] = mm.submission_paths(dir,files)
+            changed = True
+        
+        new_manifest['rounds'][round] = {'groups': groups}
+        if changed or not os.listdir(dir + '-analysis/plots/' + round):
+            changed_rounds.append(round)
+
+    summary.write_summary(dir + '-analysis', summaries) # The summary is rebuilt from scratch every run
+
+    print('Calculating metrics for ' + str(len(pending)) + ' fail groups')
+    options = {'no_cache': args.no_cache, 'engine': args.engine, 'scope_depth': args.scope_depth, 'language': args.language}
+    if args.cache_dir is not None: # Otherwise the default of multimetric
+        options['cache_dir'] = args.cache_dir
+    submissions,unique = mm.mm_groups(pending, args.jobs, None if args.compact else 2, **options)
+    if submissions: # Identical submissions are only run through multimetric once
+        print('... ' + str(submissions) + ' submissions, ' + str(unique) + ' distinct, ' +
+              '%.1f' % (100 * (submissions - unique) / submissions) + '% deduplicated')
+    for round in changed_rounds: # One columnar store per round for the plots
+        resultstore.build_store(dir + '-analysis', round)
+
+    # Plot everything!
+    plotter.plotter(dir + '-analysis', changed_rounds if args.incremental and not args.force_plots else None, args.plot_jobs, args.force_plots)
+    manifest.save_manifest(dir + '-analysis', new_manifest)
+    print('Analyzer done. Results are found in the directory ' + dir + '-analysis/')
+    
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import hashlib, json, os
+
+# Version of the results the Analyzer writes for a fail group. Increase it whenever they change,
+# e.g. the fields of the result files, so the results of earlier versions aren't reused
+VERSION = 1
+
+#####
+# load_manifest(dir)
+#
+# dir   : The analysis directory (<directory>-analysis)
+#
+# Reads the manifest of the previous run. Returns an empty manifest if there was no previous run,
+# or if the manifest can't be read, in which case everything is processed again.
+
+def load_manifest(dir):
+    try:
+        with open(dir + '/manifest.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'rounds': {}}
+
+#####
+# save_manifest(dir,manifest)
+#
+# dir       : The analysis directory (<directory>-analysis)
+# manifest  : The manifest of the current run
+#
+# Saves the manifest. Called only after a run has completed, so an interrupted run is redone on the next go.
+
+def save_manifest(dir,manifest):
+    with open(dir + '/manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+#####
+# fingerprint_group(dir,files,settings)
+#
+# dir       : The data directory the submission filenames are relative to
+# files     : The submission filenames of one fail group, see grouper.fail_groups
+# settings  : Everything else the results of the group depend on, e.g. options and versions, as a dict
+#
+# Returns a fingerprint of one fail group: the hash of the list of submissions together with the size and
+# modification time of every submission in it. The group has to be reprocessed when the fingerprint changes.
+# Stating the files is cheap compared to hashing them, and an edited submission always gets a new mtime.
+# The list is hashed as it would be printed into a filelist, so fingerprint_filelist gives the same fingerprint.
+# A change of the settings changes every fingerprint.
+
+def fingerprint_group(dir,files,settings=None):
+    fingerprint = hashlib.sha1()
+    for file in files:
+        fingerprint.update((file + '\n').encode('utf-8'))
+    for file in files:
+        try:
+            stat = os.stat(dir + '/' + file)
+            fingerprint.update((file + ':' + str(stat.st_size) + ':' + str(stat.st_mtime_ns) + '\n').encode('utf-8'))
+        except OSError:
+            fingerprint.update((file + ':missing\n').encode('utf-8'))
+    if settings is not None:
+        fingerprint.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return fingerprint.hexdigest()
+
+#####
+# fingerprint_filelist(dir,filelist,settings)
+#
+# dir       : The data directory the submission filenames are relative to
+# filelist  : A filelist written by grouper.sort_to_files
+# settings  : See fingerprint_group
+#
+# Returns the fingerprint of the fail group in a filelist, see fingerprint_group
+
+def fingerprint_filelist(dir,filelist,settings=None):
+    with open(filelist, 'r', encoding='utf-8') as f:
+        return fingerprint_group(dir, f.read().splitlines(), settings)
@@ -0,0 +1,406 @@
+import ast
+
+from multimetric.cls.calc.halstead import MetricBaseCalcHalstead
+from multimetric.cls.metric.abc_metric import MetricBaseABC
+from multimetric.cls.metric.comments import MetricBaseComments
+from multimetric.cls.metric.cyclomatic import MetricBaseCyclomaticComplexity
+from multimetric.cls.metric.fanout import MetricBaseFanout
+from multimetric.cls.metric.loc import MetricBaseLOC
+from multimetric.cls.metric.operands import MetricBaseOperands
+from multimetric.cls.metric.operators import MetricBaseOperator
+
+
+class _Scope():
+    """
+    The counters of one module, class or function. Counts include nested scopes,
+    they are added when the nested scope has been walked
+    """
+
+    def __init__(self, name, line, depth):
+        self.name = name
+        self.line = line
+        self.depth = depth
+        self.operators = 0
+        self.operatorSet = set()
+        self.operands = 0
+        self.operandSet = set()
+        self.decisions = 0
+        self.assignments = 0
+        self.branches = 0
+        self.conditionals = set()
+        self.children = []
+
+    def add(self, other):
+        self.operators += other.operators
+        self.operatorSet.update(other.operatorSet)
+        self.operands += other.operands
+        self.operandSet.update(other.operandSet)
+        self.decisions += other.decisions
+        self.assignments += other.assignments
+        self.branches += other.branches
+        self.conditionals.update(other.conditionals)
+
+    def get_results(self, max_depth):
+        res = {
+            "line": self.line,
+            MetricBaseCyclomaticComplexity.METRIC_CYCLOMATIC_COMPLEXITY: self.decisions + 1,
+            MetricBaseABC.METRIC_ABC_ASSIGNMENTS: self.assignments,
+            MetricBaseABC.METRIC_ABC_BRANCHES: self.branches,
+            MetricBaseABC.METRIC_ABC_CONDITIONALS: len(self.conditionals),
+            MetricBaseCalcHalstead.METRIC_HALSTEAD_VOLUME: MetricBaseCalcHalstead(None)._getVolume({
+                MetricBaseOperands.METRIC_OPERANDS_SUM: self.operands,
+                MetricBaseOperands.METRIC_OPERANDS_UNIQUE: len(self.operandSet),
+                MetricBaseOperator.METRIC_OPERATORS_SUM: self.operators,
+                MetricBaseOperator.METRIC_OPERATORS_UNIQUE: len(self.operatorSet)})
+        }
+        _children = get_scope_results(self.children, max_depth)
+        if _children:
+            res["scopes"] = _children
+        return res
+
+
+def get_scope_results(scopes, max_depth):
+    res = {}
+    for x in scopes:
+        if x.depth > max_depth:
+            continue
+        _key = x.name if x.name not in res else "{}@{}".format(x.name, x.line)
+        res[_key] = x.get_results(max_depth)
+    return res
+
+
+class AstEngine():
+    """
+    Computes the metrics of Python code from its syntax tree instead of the token stream.
+
+    The tree is walked once. The result is the state each of the metric modules
+    would have after parsing the code (see MetricBase.get_state), so the modules
+    produce the usual results from it. Counting differs from the token heuristics
+    where the tree knows better:
+
+    * cyclomatic complexity is 1 + the decision points (if, elif, loops, except,
+      match cases, conditional expressions, comprehension clauses, and/or)
+    * operators are the operator symbols plus the keywords of the statements
+    * ABC branches are function calls and function definitions
+    * lines of code are the physical lines
+
+    Modules, classes and functions are also tracked as nested scopes, see get_scopes
+    """
+
+    LANGUAGE = "Python"
+
+    _symbols = {
+        ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.MatMult: "@", ast.Div: "/",
+        ast.Mod: "%", ast.Pow: "**", ast.LShift: "<<", ast.RShift: ">>", ast.BitOr: "|",
+        ast.BitXor: "^", ast.BitAnd: "&", ast.FloorDiv: "//", ast.And: "and", ast.Or: "or",
+        ast.Invert: "~", ast.Not: "not", ast.UAdd: "+", ast.USub: "-", ast.Eq: "==",
+        ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+        ast.Is: "is", ast.IsNot: "is not", ast.In: "in", ast.NotIn: "not in"
+    }
+
+    _keywords = {
+        ast.Return: "return", ast.Delete: "del", ast.Pass: "pass", ast.Break: "break",
+        ast.Continue: "continue", ast.Raise: "raise", ast.Assert: "assert", ast.Global: "global",
+        ast.Nonlocal: "nonlocal", ast.With: "with", ast.AsyncWith: "async with", ast.Await: "await",
+        ast.Yield: "yield", ast.YieldFrom: "yield from", ast.Lambda: "lambda", ast.Import: "import",
+        ast.ImportFrom: "from", ast.Try: "try", ast.ExceptHandler: "except", ast.While: "while",
+        ast.For: "for", ast.AsyncFor: "async for", ast.ClassDef: "class", ast.FunctionDef: "def",
+        ast.AsyncFunctionDef: "async def"
+    }
+
+    def __init__(self, text):
+        self.__text = text
+        self.__root = _Scope("", 1, 0)
+        self.__scope = self.__root
+        self.__internal = set()
+        self.__external = set()
+        self.__strings = []
+        self.__docstrings = []
+        self.__elifs = set()
+        # Raises SyntaxError or ValueError for code that isn't valid Python
+        self.__walk(ast.parse(text))
+
+    def __operator(self, symbol):
+        self.__scope.operators += 1
+        self.__scope.operatorSet.add(symbol)
+
+    def __operand(self, value):
+        self.__scope.operands += 1
+        self.__scope.operandSet.add(value)
+
+    def __conditional(self, *spellings):
+        for x in spellings:
+            if x in MetricBaseABC._conditionals:
+                self.__scope.conditionals.add(x)
+
+    def __decision(self, count=1):
+        self.__scope.decisions += count
+
+    def __docstring(self, node):
+        if node.body and isinstance(node.body[0], ast.Expr) and \
+           isinstance(node.body[0].value, ast.Constant) and isinstance(node.body[0].value.value, str):
+            self.__docstrings.append(node.body[0].value)
+
+    def __walk(self, node):
+        _h = AstEngine._handlers.get(type(node))
+        if _h is not None:
+            _h(self, node)
+        if isinstance(node, AstEngine._scopes):
+            # The definition itself belongs to the enclosing scope, everything below it to the new one
+            _parent = self.__scope
+            self.__scope = _Scope(node.name, node.lineno, _parent.depth + 1)
+            _parent.children.append(self.__scope)
+            for x in ast.iter_child_nodes(node):
+                self.__walk(x)
+            _parent.add(self.__scope)
+            self.__scope = _parent
+        else:
+            for x in ast.iter_child_nodes(node):
+                self.__walk(x)
+
+    def _onModule(self, node):
+        self.__docstring(node)
+
+    def _onDefinition(self, node):
+        self.__operator(AstEngine._keywords[type(node)])
+        self.__operand(node.name)
+        self.__docstring(node)
+        if not isinstance(node, ast.ClassDef):
+            # A function declaration counts as a branch
+            self.__scope.branches += 1
+
+    def _onKeyword(self, node):
+        self.__operator(AstEngine._keywords[type(node)])
+
+    def _onIf(self, node):
+        _keyword = "elif" if id(node) in self.__elifs else "if"
+        self.__operator(_keyword)
+        self.__conditional(_keyword)
+        self.__decision()
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If) and \
+           node.orelse[0].col_offset == node.col_offset:
+            # An elif, unlike an if nested in an else, starts in the same column
+            self.__elifs.add(id(node.orelse[0]))
+        elif node.orelse:
+            self.__operator("else")
+            self.__conditional("else")
+
+    def _onLoop(self, node):
+        self.__operator(AstEngine._keywords[type(node)])
+        self.__conditional("while" if isinstance(node, ast.While) else "for")
+        self.__decision()
+        if node.orelse:
+            self.__operator("else")
+            self.__conditional("else")
+
+    def _onTry(self, node):
+        self.__operator("try")
+        self.__conditional("try")
+        if node.orelse:
+            self.__operator("else")
+            self.__conditional("else")
+        if node.finalbody:
+            self.__operator("finally")
+
+    def _onExceptHandler(self, node):
+        self.__operator("except")
+        self.__conditional("except")
+        self.__decision()
+        if node.name:
+            self.__operand(node.name)
+
+    def _onMatchCase(self, node):
+        self.__operator("case")
+        self.__conditional("case")
+        self.__decision()
+
+    def _onIfExp(self, node):
+        self.__operator("if")
+        self.__operator("else")
+        self.__conditional("if", "else")
+        self.__decision()
+
+    def _onComprehension(self, node):
+        self.__operator("for")
+        self.__conditional("for")
+        self.__decision(1 + len(node.ifs))
+        if node.ifs:
+            self.__operator("if")
+            self.__conditional("if")
+
+    def _onBoolOp(self, node):
+        _symbol = AstEngine._symbols[type(node.op)]
+        for _ in node.values[1:]:
+            self.__operator(_symbol)
+        self.__conditional(_symbol)
+        self.__decision(len(node.values) - 1)
+
+    def _onCompare(self, node):
+        for x in node.ops:
+            _symbol = AstEngine._symbols[type(x)]
+            self.__operator(_symbol)
+            self.__conditional(_symbol)
+
+    def _onOperation(self, node):
+        self.__operator(AstEngine._symbols[type(node.op)])
+
+    def _onAssign(self, node):
+        for _ in node.targets:
+            self.__operator("=")
+        self.__scope.assignments += len(node.targets)
+
+    def _onAugAssign(self, node):
+        self.__operator(AstEngine._symbols[type(node.op)] + "=")
+        self.__scope.assignments += 1
+
+    def _onAnnAssign(self, node):
+        self.__operator(":")
+        if node.value is not None:
+            self.__operator("=")
+            self.__scope.assignments += 1
+
+    def _onNamedExpr(self, node):
+        self.__operator(":=")
+        self.__scope.assignments += 1
+
+    def _onCall(self, node):
+        self.__operator("()")
+        self.__scope.branches += 1
+
+    def _onSubscript(self, node):
+        self.__operator("[]")
+
+    def _onSlice(self, node):
+        self.__operator(":")
+
+    def _onAttribute(self, node):
+        self.__operator(".")
+        self.__operand(node.attr)
+
+    def _onName(self, node):
+        self.__operand(node.id)
+
+    def _onArg(self, node):
+        self.__operand(node.arg)
+
+    def _onCallKeyword(self, node):
+        if node.arg is not None:
+            self.__operand(node.arg)
+
+    def _onConstant(self, node):
+        self.__operand(repr(node.value))
+        if isinstance(node.value, (str, bytes)):
+            self.__strings.append(node)
+
+    def _onJoinedStr(self, node):
+        self.__strings.append(node)
+
+    def _onImport(self, node):
+        self._onKeyword(node)
+        if isinstance(node, ast.ImportFrom):
+            _names = ["." * node.level + (node.module or "")]
+        else:
+            _names = [x.name for x in node.names]
+        for x in _names:
+            # Relative imports are internal, see MetricBaseFanout._internal
+            if x.startswith("."):
+                self.__internal.add(x)
+            else:
+                self.__external.add(x)
+
+    _scopes = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    _handlers = {
+        ast.Module: _onModule,
+        ast.FunctionDef: _onDefinition,
+        ast.AsyncFunctionDef: _onDefinition,
+        ast.ClassDef: _onDefinition,
+        ast.If: _onIf,
+        ast.For: _onLoop,
+        ast.AsyncFor: _onLoop,
+        ast.While: _onLoop,
+        ast.Try: _onTry,
+        ast.ExceptHandler: _onExceptHandler,
+        ast.IfExp: _onIfExp,
+        ast.comprehension: _onComprehension,
+        ast.BoolOp: _onBoolOp,
+        ast.Compare: _onCompare,
+        ast.BinOp: _onOperation,
+        ast.UnaryOp: _onOperation,
+        ast.Assign: _onAssign,
+        ast.AugAssign: _onAugAssign,
+        ast.AnnAssign: _onAnnAssign,
+        ast.NamedExpr: _onNamedExpr,
+        ast.Call: _onCall,
+        ast.Subscript: _onSubscript,
+        ast.Slice: _onSlice,
+        ast.Attribute: _onAttribute,
+        ast.Name: _onName,
+        ast.arg: _onArg,
+        ast.keyword: _onCallKeyword,
+        ast.Constant: _onConstant,
+        ast.JoinedStr: _onJoinedStr,
+        ast.Import: _onImport,
+        ast.ImportFrom: _onImport,
+    }
+    for _node in [ast.Return, ast.Delete, ast.Pass, ast.Break, ast.Continue, ast.Raise, ast.Assert,
+                  ast.Global, ast.Nonlocal, ast.With, ast.AsyncWith, ast.Await, ast.Yield,
+                  ast.YieldFrom, ast.Lambda]:
+        _handlers[_node] = _onKeyword
+    if hasattr(ast, "match_case"):
+        _handlers[ast.match_case] = _onMatchCase
+    if hasattr(ast, "TryStar"):
+        _handlers[ast.TryStar] = _onTry
+    del _node
+
+    def __getCommentLength(self):
+        # The tree has no comments, so look for a '#' on each line that isn't part of a string.
+        # Positions in the tree are UTF-8 byte offsets, so work on the encoded lines
+        _lines = self.__text.encode("utf-8").splitlines()
+        _covered = {}
+        for x in self.__strings:
+            for i in range(x.lineno, x.end_lineno + 1):
+                _start = x.col_offset if i == x.lineno else 0
+                _end = x.end_col_offset if i == x.end_lineno else len(_lines[i - 1])
+                _covered.setdefault(i, []).append((_start, _end))
+        res = 0
+        for x in self.__docstrings:
+            for i in range(x.lineno, x.end_lineno + 1):
+                _start = x.col_offset if i == x.lineno else 0
+                _end = x.end_col_offset if i == x.end_lineno else len(_lines[i - 1])
+                res += len(_lines[i - 1][_start:_end].decode("utf-8", errors="replace"))
+        for i, _line in enumerate(_lines, start=1):
+            _pos = _line.find(b"#")
+            while _pos >= 0:
+                if not any(_start <= _pos < _end for _start, _end in _covered.get(i, [])):
+                    res += len(_line[_pos:].decode("utf-8", errors="replace"))
+                    break
+                _pos = _line.find(b"#", _pos + 1)
+        return res
+
+    def get_states(self):
+        """
+        Returns a dict mapping each metric module class to its state
+        """
+        _lang = [AstEngine.LANGUAGE]
+        return {
+            MetricBaseComments: {"lang": _lang, "overall": len(self.__text),
+                                 "comments": self.__getCommentLength()},
+            MetricBaseCyclomaticComplexity: {"lang": _lang, "conditions": self.__root.decisions,
+                                             "exitpoints": 1},
+            MetricBaseFanout: {"lang": _lang, "internal": self.__internal, "external": self.__external},
+            MetricBaseLOC: {"lang": _lang, "loc": max(self.__text.count("\n"), 1)},
+            MetricBaseOperands: {"lang": _lang, "sum": self.__root.operands,
+                                 "operands": self.__root.operandSet},
+            MetricBaseOperator: {"lang": _lang, "sum": self.__root.operators,
+                                 "operators": self.__root.operatorSet},
+            MetricBaseABC: {"lang": _lang, "assignments": self.__root.assignments,
+                            "branches": self.__root.branches, "conditionals": self.__root.conditionals},
+        }
+
+    def get_scopes(self, max_depth):
+        """
+        Returns the cyclomatic complexity, ABC vector and Halstead volume per class and function,
+        nested like the code and down to max_depth levels. Deeper scopes are still counted in their parents
+        """
+        return get_scope_results(self.__root.children, max_depth)
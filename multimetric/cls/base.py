@@ -2,9 +2,46 @@ class MetricBase():
     def __init__(self, args, **kwargs):
         self._metrics = {"lang": []}
 
+    @classmethod
+    def dispatchable(cls, language):
+        """
+        Returns True if the metric can be fed token by token through get_handler
+        """
+        return True
+
+    @classmethod
+    def get_handler(cls, language, ttype):
+        """
+        Returns the function handling tokens of the type ttype in language,
+        called as function(metric, value), or None if the type is of no interest.
+        The result must only depend on the arguments, so it can be cached
+        """
+        return None
+
     def parse_tokens(self, language, tokens):
         if language not in self._metrics["lang"]:
             self._metrics["lang"].append(language)
+        for x in tokens:
+            _h = self.get_handler(language, x[0])
+            if _h is not None:
+                _h(self, x[1])
 
     def get_results(self):
         return self._metrics
+
+    def get_state(self):
+        """
+        Returns the partial state collected by parse_tokens.
+        The state is small and picklable, so it can be passed between processes
+        and merged into another instance of the same class with merge_state
+        """
+        return {"lang": list(self._metrics["lang"])}
+
+    def merge_state(self, state):
+        """
+        Merges a state from get_state into this instance, as if the tokens
+        behind that state had been passed to parse_tokens
+        """
+        for x in state["lang"]:
+            if x not in self._metrics["lang"]:
+                self._metrics["lang"].append(x)
@@ -8,3 +8,16 @@ class MetricBaseStats():
         This alters the originally passed metrics by calculated ones
         """
         return metrics
+
+    def add(self, results):
+        """
+        Feeds the results of one file, for get_stream_results
+        """
+        pass
+
+    def get_stream_results(self, overall, count):
+        """
+        Returns the sections get_results would add to the metrics,
+        from the count files fed through add instead of all results at once
+        """
+        return {}
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pickle
+import platform
+import tempfile
+
+import pygments
+
+_sourceDigest = None
+
+
+def get_source_digest():
+    """
+    Returns a hash of the code of the package, any change to it invalidates results computed before
+    """
+    global _sourceDigest
+    if _sourceDigest is None:
+        _hash = hashlib.sha256()
+        _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for _dir, _subdirs, _files in sorted(os.walk(_root)):
+            _subdirs.sort()
+            for x in sorted(_files):
+                if x.endswith(".py"):
+                    _hash.update(x.encode("utf-8"))
+                    with open(os.path.join(_dir, x), "rb") as i:
+                        _hash.update(i.read())
+        _sourceDigest = _hash.hexdigest()
+    return _sourceDigest
+
+
+def get_versions():
+    """
+    Returns the versions the results depend on: the code of the package, Pygments, which tokenizes
+    the files, and Python, whose ast module the ast engine parses them with
+    """
+    return [get_source_digest(), "pygments " + pygments.__version__, "python " + platform.python_version()]
+
+
+class ResultCache():
+    """
+    On disk cache of per file results, addressed by a hash of the file content,
+    the lexer, the code of the metric modules and the options influencing the results.
+    Eviction is least recently used, once the cache grows beyond maxsize bytes
+    """
+
+    def __init__(self, path, maxsize, options):
+        self.__path = path
+        self.__maxsize = maxsize
+        self.__salt = "\0".join(get_versions() + [str(x) for x in options]).encode("utf-8")
+
+    def key(self, content, language):
+        _hash = hashlib.sha256(self.__salt)
+        _hash.update(b"\0" + language.encode("utf-8") + b"\0")
+        _hash.update(content)
+        return _hash.hexdigest()
+
+    def __getPath(self, key):
+        return os.path.join(self.__path, key[:2], key + ".pickle")
+
+    def get(self, key):
+        _path = self.__getPath(key)
+        try:
+            with open(_path, "rb") as i:
+                res = pickle.load(i)
+            # Mark as recently used
+            os.utime(_path)
+            return res
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key, value):
+        _path = self.__getPath(key)
+        try:
+            os.makedirs(os.path.dirname(_path), exist_ok=True)
+            # Write to a temporary file first, other processes might read the entry at the same time
+            _fd, _tmp = tempfile.mkstemp(dir=os.path.dirname(_path), suffix=".tmp")
+            with os.fdopen(_fd, "wb") as o:
+                pickle.dump(value, o, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(_tmp, _path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """
+        Removes the least recently used entries until the cache fits into maxsize
+        """
+        _entries = []
+        _total = 0
+        try:
+            _shards = [x.path for x in os.scandir(self.__path) if x.is_dir()]
+        except OSError:
+            return
+        for _shard in _shards:
+            for x in os.scandir(_shard):
+                if not x.name.endswith(".pickle"):
+                    continue
+                _stat = x.stat()
+                _entries.append((_stat.st_mtime, _stat.st_size, x.path))
+                _total += _stat.st_size
+        if _total <= self.__maxsize:
+            return
+        for _, _size, _path in sorted(_entries):
+            try:
+                os.remove(_path)
+            except OSError:
+                continue
+            _total -= _size
+            if _total <= self.__maxsize:
+                break
+
+
+def cache_from_args(args):
+    """
+    Returns the ResultCache configured on the command line or None if caching is disabled
+    """
+    if args.no_cache or args.dump:
+        return None
+    return ResultCache(args.cache_dir, args.cache_size * 1024 * 1024,
+                       [getattr(args, "halstead_bug_predict_method", None),
+                        getattr(args, "maintenance_index_calc_method", None),
+                        args.detect_limit, args.engine, args.scope_depth])
@@ -0,0 +1,63 @@
+"""
+Shared classification of Pygments tokens into small integer bitmasks.
+
+Metric modules register the token type names and token values they are
+interested in and get a bit for each category back. A token type is
+converted to a string and matched against all categories only the first
+time it is seen, afterwards its bitmask comes from a dict keyed by the
+token type object itself. Pygments token types are singletons, so these
+lookups resolve by identity.
+"""
+
+_type_categories = []
+_type_masks = {}
+_value_bits = 0
+_value_masks = {}
+
+
+def register_types(names):
+    """
+    Registers a category of token type names like "Token.Name.Function"
+    and returns the bit representing it
+    """
+    _bit = 1 << len(_type_categories)
+    _type_categories.append((_bit, frozenset(names)))
+    # Masks computed so far lack the new category
+    _type_masks.clear()
+    return _bit
+
+
+def register_values(values):
+    """
+    Registers a category of token values like "while"
+    and returns the bit representing it
+    """
+    global _value_bits
+    _bit = 1 << _value_bits
+    _value_bits += 1
+    for x in values:
+        _value_masks[x] = _value_masks.get(x, 0) | _bit
+    return _bit
+
+
+def classify_type(ttype):
+    """
+    Returns the bitmask of all categories the token type belongs to
+    """
+    try:
+        return _type_masks[ttype]
+    except KeyError:
+        _name = str(ttype)
+        _mask = 0
+        for _bit, _names in _type_categories:
+            if _name in _names:
+                _mask |= _bit
+        _type_masks[ttype] = _mask
+        return _mask
+
+
+def classify_value(value):
+    """
+    Returns the bitmask of all categories the token value belongs to
+    """
+    return _value_masks.get(value, 0)
@@ -0,0 +1,45 @@
+import codecs
+
+import chardet
+
+DECODER_BOM = "bom"
+DECODER_UTF8 = "utf-8"
+DECODER_CHARDET = "chardet"
+
+# UTF-32 first, its little endian BOM starts with the UTF-16 one
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def decode_content(content, detect_limit=0):
+    """
+    Decodes the raw bytes of a file to text. content can be any buffer, like a memory mapped file,
+    it is decoded without making a bytes copy of it first.
+    A byte order mark decides the encoding if there is one, otherwise strict UTF-8 is tried.
+    Only if that fails chardet guesses the encoding from the first detect_limit bytes,
+    or from all of them if detect_limit is 0.
+
+    Returns a tuple of the text, the encoding and which of the DECODER_* paths was taken
+    """
+    for _bom, _enc in _BOMS:
+        if content[:len(_bom)] == _bom:
+            return (str(content, _enc), _enc, DECODER_BOM)
+    try:
+        return (str(content, "utf-8"), "utf-8", DECODER_UTF8)
+    except UnicodeDecodeError:
+        pass
+    if 0 < detect_limit < len(content):
+        _enc = chardet.detect(content[:detect_limit])["encoding"]
+        try:
+            return (str(content, _enc), _enc, DECODER_CHARDET)
+        except (UnicodeDecodeError, LookupError, TypeError):
+            # The prefix wasn't representative, look at everything
+            pass
+    # chardet only takes bytes
+    _enc = chardet.detect(content if isinstance(content, (bytes, bytearray)) else bytes(content))["encoding"]
+    return (str(content, _enc), _enc, DECODER_CHARDET)
@@ -0,0 +1,44 @@
+class TokenDispatcher():
+    """
+    Feeds one token stream to several metric modules in a single pass.
+
+    The table mapping a token type to the handlers of the metrics is built
+    lazily and shared by all dispatchers for the same language and metric classes,
+    so each token type is only classified once per process
+    """
+
+    __tables = {}
+
+    def __init__(self, language, metrics):
+        self.__language = language
+        self.__metrics = metrics
+        self.__fused = [x for x in metrics if x.dispatchable(language)]
+        self.__rest = [x for x in metrics if not x.dispatchable(language)]
+        _key = (language, tuple(type(x) for x in self.__fused))
+        self.__table = TokenDispatcher.__tables.setdefault(_key, {})
+
+    def __lookup(self, ttype):
+        res = []
+        for i, x in enumerate(self.__fused):
+            _h = x.get_handler(self.__language, ttype)
+            if _h is not None:
+                res.append((i, _h))
+        self.__table[ttype] = tuple(res)
+        return self.__table[ttype]
+
+    def parse_tokens(self, tokens):
+        if self.__rest:
+            tokens = list(tokens)
+            for x in self.__rest:
+                x.parse_tokens(self.__language, tokens)
+        # An empty stream registers the language and resets the per input state
+        for x in self.__fused:
+            x.parse_tokens(self.__language, [])
+        _fused = self.__fused
+        _table = self.__table
+        for ttype, value in tokens:
+            _h = _table.get(ttype)
+            if _h is None:
+                _h = self.__lookup(ttype)
+            for i, func in _h:
+                func(_fused[i], value)
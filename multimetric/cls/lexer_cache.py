@@ -0,0 +1,33 @@
+import fnmatch
+import os
+import re
+
+from pygments import lexers
+from pygments.lexers._mapping import LEXERS
+
+_lexers = {}
+_pinned = {}
+
+# Lexers are picked by matching the filename against the patterns of all lexers.
+# For the common "*.ext" patterns the extension alone decides, all other patterns
+# (like "CMakeLists.txt" or "*Spec.hs") could override it for single files
+_simple = re.compile(r"^\*\.[^*?\[\].]+$")
+_special = re.compile("|".join(fnmatch.translate(p) for _lexer in LEXERS.values()
+                               for p in _lexer[3] if not _simple.match(p)))
+
+
+def get_lexer(filename, language=None):
+    """
+    Returns a lexer for filename, or the lexer of language if one is pinned.
+    Lexers are instantiated once per extension, or for special filenames once per name
+    """
+    if language:
+        if language not in _pinned:
+            _pinned[language] = lexers.get_lexer_by_name(language)
+        return _pinned[language]
+    _name = os.path.basename(filename)
+    _ext = os.path.splitext(_name)[1]
+    _key = _ext if _ext and not _special.match(_name) else _name
+    if _key not in _lexers:
+        _lexers[_key] = lexers.get_lexer_for_filename(filename)
+    return _lexers[_key]
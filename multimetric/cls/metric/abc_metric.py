@@ -1,4 +1,8 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import classify_value
+from multimetric.cls.classify import register_types
+from multimetric.cls.classify import register_values
 
 # ABC Rules:
 # A) Add 1 to A with assignment operators (=, +=, -=, *=, /=, %=, //=, **=, &=, |=, ^=, >>=, <<=)
@@ -51,6 +55,9 @@ class MetricBaseABC(MetricBase):
         "and",
         "or"
     ]
+    _assignmentsCategory = register_values(_assignments)
+    _branchesCategory = register_types(_branches)
+    _conditionalsCategory = register_values(_conditionals)
 
     METRIC_ABC_ASSIGNMENTS = "ABC_Assignments"
     METRIC_ABC_BRANCHES = "ABC_Branches"
@@ -58,22 +65,43 @@ class MetricBaseABC(MetricBase):
 
     def __init__(self, args, **kwargs):
         super().__init__(args, **kwargs)
-        self.__ABC_Assignments = []
-        self.__ABC_Branches = []
-        self.__ABC_Conditionals = []
+        self.__ABC_Assignments = 0
+        self.__ABC_Branches = 0
+        self.__ABC_Conditionals = set()
 
-    def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        for x in tokens:
-            if str(x[1]) in MetricBaseABC._assignments:
-                self.__ABC_Assignments.append(str(x[1]))
-            if str(x[0]) in MetricBaseABC._branches:
-                self.__ABC_Branches.append(str(x[1]))
-            if str(x[1]) in MetricBaseABC._conditionals:
-                self.__ABC_Conditionals.append(str(x[1]))
+    @classmethod
+    def get_handler(cls, language, ttype):
+        # Assignments and conditionals are found by value, so every token is of interest
+        if classify_type(ttype) & MetricBaseABC._branchesCategory:
+            return MetricBaseABC._onBranch
+        return MetricBaseABC._onToken
+
+    def _onBranch(self, value):
+        self.__ABC_Branches += 1
+        self._onToken(value)
+
+    def _onToken(self, value):
+        _v = classify_value(value)
+        if _v & MetricBaseABC._assignmentsCategory:
+            self.__ABC_Assignments += 1
+        if _v & MetricBaseABC._conditionalsCategory:
+            self.__ABC_Conditionals.add(value)
 
     def get_results(self):
-        self._metrics[MetricBaseABC.METRIC_ABC_ASSIGNMENTS] = len(self.__ABC_Assignments)
-        self._metrics[MetricBaseABC.METRIC_ABC_BRANCHES] = len(self.__ABC_Branches)
-        self._metrics[MetricBaseABC.METRIC_ABC_CONDITIONALS] = len(list(set(self.__ABC_Conditionals)))
+        self._metrics[MetricBaseABC.METRIC_ABC_ASSIGNMENTS] = self.__ABC_Assignments
+        self._metrics[MetricBaseABC.METRIC_ABC_BRANCHES] = self.__ABC_Branches
+        self._metrics[MetricBaseABC.METRIC_ABC_CONDITIONALS] = len(self.__ABC_Conditionals)
         return self._metrics
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"assignments": self.__ABC_Assignments,
+                    "branches": self.__ABC_Branches,
+                    "conditionals": self.__ABC_Conditionals})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__ABC_Assignments += state["assignments"]
+        self.__ABC_Branches += state["branches"]
+        self.__ABC_Conditionals.update(state["conditionals"])
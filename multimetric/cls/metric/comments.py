@@ -1,4 +1,6 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import register_types
 
 
 class MetricBaseComments(MetricBase):
@@ -16,6 +18,8 @@ class MetricBaseComments(MetricBase):
             "Token.Comment.Preproc"
         ]
     }
+    _category = register_types(_needles)
+    _specificCategory = {k: register_types(v) for k, v in _specific.items()}
 
     METRIC_COMMENT_RATIO = "comment_ratio"
 
@@ -24,15 +28,29 @@ class MetricBaseComments(MetricBase):
         self.__overall = 0
         self.__comments = 0
 
-    def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        _n = MetricBaseComments._needles
-        if language in MetricBaseComments._specific:
-            _n += MetricBaseComments._specific[language]
-        for x in tokens:
-            self.__overall += len(str(x[1]))
-            if str(x[0]) in _n:
-                self.__comments += len(str(x[1]))
+    @classmethod
+    def get_handler(cls, language, ttype):
+        _n = MetricBaseComments._category | MetricBaseComments._specificCategory.get(language, 0)
+        if classify_type(ttype) & _n:
+            return MetricBaseComments._onComment
+        return MetricBaseComments._onCode
+
+    def _onComment(self, value):
+        self.__overall += len(value)
+        self.__comments += len(value)
+
+    def _onCode(self, value):
+        self.__overall += len(value)
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"overall": self.__overall, "comments": self.__comments})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__overall += state["overall"]
+        self.__comments += state["comments"]
 
     def get_results(self):
         if self.__overall == 0:
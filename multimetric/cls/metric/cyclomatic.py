@@ -1,4 +1,6 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_value
+from multimetric.cls.classify import register_values
 
 
 class MetricBaseCyclomaticComplexity(MetricBase):
@@ -26,6 +28,9 @@ class MetricBaseCyclomaticComplexity(MetricBase):
         "||"
     ]
 
+    __exitPointsCategory = register_values(__exitPoints)
+    __conditionsCategory = register_values(__conditions)
+
     METRIC_CYCLOMATIC_COMPLEXITY = "cyclomatic_complexity"
 
     def __init__(self, args, **kwargs):
@@ -33,13 +38,26 @@ class MetricBaseCyclomaticComplexity(MetricBase):
         self.__conditions = 0
         self.__exitpoints = 0
 
-    def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        for x in tokens:
-            if str(x[1]) in MetricBaseCyclomaticComplexity.__exitPoints:
-                self.__exitpoints += 1
-            if str(x[1]) in MetricBaseCyclomaticComplexity.__conditions:
-                self.__conditions += 1
+    @classmethod
+    def get_handler(cls, language, ttype):
+        return MetricBaseCyclomaticComplexity._onToken
+
+    def _onToken(self, value):
+        _v = classify_value(value)
+        if _v & MetricBaseCyclomaticComplexity.__exitPointsCategory:
+            self.__exitpoints += 1
+        if _v & MetricBaseCyclomaticComplexity.__conditionsCategory:
+            self.__conditions += 1
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"conditions": self.__conditions, "exitpoints": self.__exitpoints})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__conditions += state["conditions"]
+        self.__exitpoints += state["exitpoints"]
 
     def get_results(self):
         self._metrics[MetricBaseCyclomaticComplexity.METRIC_CYCLOMATIC_COMPLEXITY] = max(
@@ -1,4 +1,8 @@
+import functools
+
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import register_types
 
 
 class MetricBaseFanout(MetricBase):
@@ -13,6 +17,7 @@ class MetricBaseFanout(MetricBase):
             "Token.Comment.PreprocFile"
         ]
     }
+    _categories = {k: register_types(v) for k, v in _needles.items()}
     _functions = {
         "PHP": "_parsePHP",
         "Go": "_parseGo",
@@ -76,28 +81,48 @@ class MetricBaseFanout(MetricBase):
                         break
         return res
 
+    @classmethod
+    def dispatchable(cls, language):
+        # These languages need to look ahead in the token stream
+        return language not in MetricBaseFanout._functions
+
+    @classmethod
+    def get_handler(cls, language, ttype):
+        if classify_type(ttype) & MetricBaseFanout._categories.get(language, 0):
+            return functools.partial(MetricBaseFanout._onImport,
+                                     internal=MetricBaseFanout.__getInternal(language))
+        return None
+
+    @staticmethod
+    def __getInternal(language):
+        return MetricBaseFanout._internal.get(language, {"start": "", "end": ""})
+
+    def _onImport(self, value, internal):
+        if self.__isInternal(value, internal):
+            self._int.add(str(value))
+        else:
+            self._ext.add(str(value))
+
     def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        if language in MetricBaseFanout._internal:
-            _i = MetricBaseFanout._internal[language]
+        if language in MetricBaseFanout._functions:
+            super().parse_tokens(language, [])
+            _i = MetricBaseFanout.__getInternal(language)
+            for x in getattr(self, MetricBaseFanout._functions[language])(enumerate(tokens)):
+                self._onImport(x, _i)
         else:
-            _i = {"start": "", "end": ""}
-        _imports = []
-        if language in MetricBaseFanout._needles.keys():
-            _n = MetricBaseFanout._needles[language]
-            for x in [x for x in tokens if str(x[0]) in _n]:
-                _imports.append(x[1])
-        elif language in MetricBaseFanout._functions:
-            _imports = getattr(self,
-                               MetricBaseFanout._functions[language])(enumerate(tokens))
-        # else:
-        #     # Language isn't supported at the moment
-        #     for x in tokens:
-        #         print(str(x))
-        for x in _imports:
-            if self.__isInternal(x, _i):
-                self._int.add(str(x))
-            else:
-                self._ext.add(str(x))
-        self._metrics.update({MetricBaseFanout.METRIC_FANOUT_INTERNAL: len(list(self._int)),
-                              MetricBaseFanout.METRIC_FANOUT_EXTERNAL: len(list(self._ext))})
+            super().parse_tokens(language, tokens)
+
+    def get_results(self):
+        self._metrics.update({MetricBaseFanout.METRIC_FANOUT_INTERNAL: len(self._int),
+                              MetricBaseFanout.METRIC_FANOUT_EXTERNAL: len(self._ext)})
+        return self._metrics
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"internal": self._int, "external": self._ext})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self._int.update(state["internal"])
+        self._ext.update(state["external"])
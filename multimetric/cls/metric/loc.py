@@ -1,4 +1,6 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import register_types
 
 
 class MetricBaseLOC(MetricBase):
@@ -7,14 +9,35 @@ class MetricBaseLOC(MetricBase):
     _needles = [
         "Token.Text"
     ]
+    _category = register_types(_needles)
 
     def __init__(self, args, **kwargs):
         super().__init__(args, **kwargs)
+        self.__loc = 0
+
+    @classmethod
+    def get_handler(cls, language, ttype):
+        if classify_type(ttype) & MetricBaseLOC._category:
+            return MetricBaseLOC._onText
+        return None
+
+    def _onText(self, value):
+        self.__loc += value.count('\n')
 
     def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        self._metrics[MetricBaseLOC.METRIC_LOC] = 0
-        for x in tokens:
-            if str(x[0]) in MetricBaseLOC._needles:
-                self._metrics[MetricBaseLOC.METRIC_LOC] += len([y for y in x[1] if y == '\n'])
-        self._metrics[MetricBaseLOC.METRIC_LOC] = max(self._metrics[MetricBaseLOC.METRIC_LOC], 1)
+        # The lines of code always reflect the latest parsed input
+        self.__loc = 0
+        super().parse_tokens(language, tokens)
+
+    def get_results(self):
+        self._metrics[MetricBaseLOC.METRIC_LOC] = max(self.__loc, 1)
+        return self._metrics
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"loc": max(self.__loc, 1)})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__loc = state["loc"]
@@ -1,4 +1,6 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import register_types
 
 
 class MetricBaseOperands(MetricBase):
@@ -41,21 +43,37 @@ class MetricBaseOperands(MetricBase):
         "Token.String.Single",
         "Token.String.Symbol"
     ]
+    _category = register_types(_needles)
 
     METRIC_OPERANDS_SUM = "operands_sum"
     METRIC_OPERANDS_UNIQUE = "operands_uniq"
 
     def __init__(self, args, **kwargs):
         super().__init__(args, **kwargs)
-        self.__operands = []
+        self.__sum = 0
+        self.__operands = set()
 
-    def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        for x in tokens:
-            if str(x[0]) in MetricBaseOperands._needles:
-                self.__operands.append(str(x[1]))
+    @classmethod
+    def get_handler(cls, language, ttype):
+        if classify_type(ttype) & MetricBaseOperands._category:
+            return MetricBaseOperands._onOperand
+        return None
+
+    def _onOperand(self, value):
+        self.__sum += 1
+        self.__operands.add(value)
 
     def get_results(self):
-        self._metrics[MetricBaseOperands.METRIC_OPERANDS_SUM] = len(self.__operands)
-        self._metrics[MetricBaseOperands.METRIC_OPERANDS_UNIQUE] = len(list(set(self.__operands)))
+        self._metrics[MetricBaseOperands.METRIC_OPERANDS_SUM] = self.__sum
+        self._metrics[MetricBaseOperands.METRIC_OPERANDS_UNIQUE] = len(self.__operands)
         return self._metrics
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"sum": self.__sum, "operands": self.__operands})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__sum += state["sum"]
+        self.__operands.update(state["operands"])
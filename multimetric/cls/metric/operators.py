@@ -1,4 +1,6 @@
 from multimetric.cls.base import MetricBase
+from multimetric.cls.classify import classify_type
+from multimetric.cls.classify import register_types
 
 
 class MetricBaseOperator(MetricBase):
@@ -17,21 +19,37 @@ class MetricBaseOperator(MetricBase):
         "Token.String.Affix",
         "Token.String.Delimiter",
     ]
+    _category = register_types(_needles)
 
     METRIC_OPERATORS_SUM = "operators_sum"
     METRIC_OPERATORS_UNIQUE = "operators_uniq"
 
     def __init__(self, args, **kwargs):
         super().__init__(args, **kwargs)
-        self.__operator = []
+        self.__sum = 0
+        self.__operator = set()
 
-    def parse_tokens(self, language, tokens):
-        super().parse_tokens(language, [])
-        for x in tokens:
-            if str(x[0]) in MetricBaseOperator._needles:
-                self.__operator.append(str(x[1]))
+    @classmethod
+    def get_handler(cls, language, ttype):
+        if classify_type(ttype) & MetricBaseOperator._category:
+            return MetricBaseOperator._onOperator
+        return None
+
+    def _onOperator(self, value):
+        self.__sum += 1
+        self.__operator.add(value)
 
     def get_results(self):
-        self._metrics[MetricBaseOperator.METRIC_OPERATORS_SUM] = len(self.__operator)
-        self._metrics[MetricBaseOperator.METRIC_OPERATORS_UNIQUE] = len(list(set(self.__operator)))
+        self._metrics[MetricBaseOperator.METRIC_OPERATORS_SUM] = self.__sum
+        self._metrics[MetricBaseOperator.METRIC_OPERATORS_UNIQUE] = len(self.__operator)
         return self._metrics
+
+    def get_state(self):
+        res = super().get_state()
+        res.update({"sum": self.__sum, "operators": self.__operator})
+        return res
+
+    def merge_state(self, state):
+        super().merge_state(state)
+        self.__sum += state["sum"]
+        self.__operator.update(state["operators"])
@@ -50,3 +50,9 @@ def get_additional_parser_args(parser):
                         default=MetricBaseCalcMaintenanceIndex.MI_DEFAULT,
                         help="Method how to calculate the maintainability index",
                         dest="maintenance_index_calc_method")
+    parser.add_argument("--percentiles",
+                        choices=MetricBaseStatsAverage.PERCENTILE_METHOD,
+                        default=MetricBaseStatsAverage.PERCENTILE_DEFAULT,
+                        help="Calculate the median and percentiles of the stats exactly,\n"
+                             "or estimate them in constant memory",
+                        dest="stats_percentile_method")
@@ -0,0 +1,43 @@
+import contextlib
+import mmap
+import os
+
+
+class FileTooLarge(Exception):
+    """
+    Raised for files beyond the maximum file size, they are skipped instead of parsed
+    """
+
+
+def _check_size(size, max_size):
+    if 0 < max_size < size:
+        raise FileTooLarge("{} bytes, more than the maximum file size of {} bytes".format(size, max_size))
+
+
+@contextlib.contextmanager
+def open_content(path, content=None, mmap_threshold=0, max_size=0):
+    """
+    Provides the raw content of the file at path, or content if that is given.
+    Files of at least mmap_threshold bytes are memory mapped instead of read, 0 reads every file.
+    A mapped file is a buffer, not bytes, and is only valid inside the with block.
+    Raises FileTooLarge for content of more than max_size bytes, 0 allows any size
+    """
+    if content is not None:
+        _check_size(len(content), max_size)
+        yield content
+        return
+    with open(path, "rb") as i:
+        _size = os.fstat(i.fileno()).st_size
+        _check_size(_size, max_size)
+        _map = None
+        if 0 < mmap_threshold <= _size:
+            try:
+                _map = mmap.mmap(i.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Not every file can be mapped, e.g. on some network file systems
+                pass
+        if _map is None:
+            yield i.read()
+        else:
+            with _map:
+                yield _map
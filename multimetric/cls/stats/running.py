@@ -0,0 +1,118 @@
+import array
+import bisect
+import math
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def _quantile(values, p):
+    # Linear interpolation between the closest ranks of the sorted values, like numpy.percentile does
+    _pos = (len(values) - 1) * p
+    _lower = math.floor(_pos)
+    if _lower + 1 >= len(values):
+        return values[_lower]
+    return values[_lower] + (_pos - _lower) * (values[_lower + 1] - values[_lower])
+
+
+class P2Quantile():
+    """
+    Estimates one quantile in constant memory with the P-square algorithm (Jain & Chlamtac, 1985).
+    Five markers track the minimum, the maximum, the quantile and the halfway points in between,
+    their heights are adjusted by piecewise parabolic interpolation as values come in
+    """
+
+    def __init__(self, p):
+        self.__p = p
+        self.__heights = []
+        self.__positions = [0, 1, 2, 3, 4]
+        self.__desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.__increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value):
+        q = self.__heights
+        if len(q) < 5:
+            bisect.insort(q, value)
+            return
+        n = self.__positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = bisect.bisect_right(q, value) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        _desired = self.__desired
+        _increments = self.__increments
+        for i in range(1, 4):
+            _desired[i] += _increments[i]
+            d = _desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                _height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < _height < q[i + 1]:
+                    # Parabolic prediction left the neighbours, fall back to linear
+                    _height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = _height
+                n[i] += d
+
+    def get(self):
+        if len(self.__heights) < 5:
+            return _quantile(self.__heights, self.__p)
+        return self.__heights[2]
+
+
+class RunningStats():
+    """
+    One pass statistics of a series of values: Welford's mean and variance, minimum, maximum
+    and the PERCENTILES. Percentiles are exact if exact is set, which keeps the values as doubles,
+    otherwise they are estimated in constant memory by P2Quantile
+    """
+
+    def __init__(self, exact=True):
+        self.__count = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__min = None
+        self.__max = None
+        self.__values = array.array("d") if exact else None
+        self.__quantiles = None if exact else [P2Quantile(x / 100) for x in PERCENTILES]
+
+    def add(self, value):
+        self.__count += 1
+        _delta = value - self.__mean
+        self.__mean += _delta / self.__count
+        self.__m2 += _delta * (value - self.__mean)
+        if self.__min is None or value < self.__min:
+            self.__min = value
+        if self.__max is None or value > self.__max:
+            self.__max = value
+        if self.__values is not None:
+            self.__values.append(value)
+        else:
+            for x in self.__quantiles:
+                x.add(value)
+
+    @property
+    def count(self):
+        return self.__count
+
+    def get_results(self):
+        """
+        Returns a dict of mean, min, max, percentiles (p<N>) and, from two values on, sd
+        """
+        res = {"mean": self.__mean, "min": self.__min, "max": self.__max}
+        if self.__count > 1:
+            res["sd"] = math.sqrt(self.__m2 / (self.__count - 1))
+        if self.__values is not None:
+            _sorted = sorted(self.__values)
+            _percentiles = [_quantile(_sorted, x / 100) for x in PERCENTILES]
+        else:
+            _percentiles = [x.get() for x in self.__quantiles]
+        for p, v in zip(PERCENTILES, _percentiles):
+            res["p{}".format(p)] = float(v)
+        return res
@@ -1,37 +1,92 @@
-import statistics
-
 from multimetric.cls.base_stats import MetricBaseStats
+from multimetric.cls.stats.running import PERCENTILES
+from multimetric.cls.stats.running import RunningStats
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class MetricBaseStatsAverage(MetricBaseStats):
+    PERCENTILE_METHOD = ["exact", "approx"]
+    PERCENTILE_DEFAULT = "exact"
 
     def __init__(self, args, **kwargs):
         super().__init__(args, **kwargs)
+        self.__args = args
+        self.__exact = getattr(args, "stats_percentile_method",
+                               MetricBaseStatsAverage.PERCENTILE_DEFAULT) == "exact"
+        self.__running = {}
+
+    @staticmethod
+    def _isValue(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
 
-    def _getInputList(self, metrics, key):
-        res = []
-        for _, v in metrics.items():
-            if key in v and not isinstance(v[key], list):
-                res.append(v[key])
+    def _getSections(self, count):
+        res = {"mean": {}, "max": {}, "min": {}}
+        if count > 1:
+            res["sd"] = {}
+        res["median"] = {}
+        for p in PERCENTILES:
+            if p != 50:
+                res["p{}".format(p)] = {}
         return res
 
-    def get_results(self, metrics, files="files", overall="overall"):
-        _keylist = list(metrics[overall].keys())
-        metrics["stats"] = {}
-        metrics["stats"]["mean"] = {}
-        metrics["stats"]["max"] = {}
-        metrics["stats"]["min"] = {}
-        if len(metrics["files"]) > 1:
-            metrics["stats"]["sd"] = {}
-        metrics["stats"]["median"] = {}
-        for k in _keylist:
-            _list = self._getInputList(metrics[files], k)
-            if not _list:
+    def _setStats(self, res, key, stats):
+        for k, v in stats.items():
+            if k == "p50":
+                k = "median"
+            if k in res:
+                res[k][key] = v
+
+    def _getNumpyStats(self, metrics, keys, count):
+        # One column per key, files without a value for the key are NaN
+        _matrix = numpy.full((len(metrics), len(keys)), numpy.nan)
+        _ints = [True] * len(keys)
+        for i, v in enumerate(metrics.values()):
+            for j, k in enumerate(keys):
+                if k in v and self._isValue(v[k]):
+                    _matrix[i, j] = v[k]
+                    _ints[j] = _ints[j] and isinstance(v[k], int)
+        res = self._getSections(count)
+        for j, k in enumerate(keys):
+            _column = _matrix[:, j]
+            _column = _column[~numpy.isnan(_column)]
+            if not _column.size:
                 continue
-            metrics["stats"]["mean"][k] = statistics.mean(_list)
-            metrics["stats"]["median"][k] = statistics.median(_list)
-            metrics["stats"]["max"][k] = max(_list)
-            metrics["stats"]["min"][k] = min(_list)
-            if len(metrics["files"]) > 1:
-                metrics["stats"]["sd"][k] = statistics.stdev(_list)
+            _type = int if _ints[j] else float
+            _stats = {"mean": float(_column.mean()),
+                      "min": _type(_column.min()),
+                      "max": _type(_column.max())}
+            if _column.size > 1:
+                _stats["sd"] = float(_column.std(ddof=1))
+            for p, v in zip(PERCENTILES, numpy.percentile(_column, PERCENTILES)):
+                _stats["p{}".format(p)] = float(v)
+            self._setStats(res, k, _stats)
+        return res
+
+    def get_results(self, metrics, files="files", overall="overall"):
+        _keys = [k for k, v in metrics[overall].items() if self._isValue(v)]
+        if numpy is not None and self.__exact:
+            metrics["stats"] = self._getNumpyStats(metrics[files], _keys, len(metrics["files"]))
+        else:
+            _stats = MetricBaseStatsAverage(self.__args)
+            for v in metrics[files].values():
+                _stats.add(v)
+            metrics["stats"] = _stats.get_stream_results(metrics[overall], len(metrics["files"]))["stats"]
         return super().get_results(metrics, files="files", overall="overall")
+
+    def add(self, results):
+        for k, v in results.items():
+            if self._isValue(v):
+                if k not in self.__running:
+                    self.__running[k] = RunningStats(self.__exact)
+                self.__running[k].add(v)
+
+    def get_stream_results(self, overall, count):
+        res = self._getSections(count)
+        for k, v in overall.items():
+            if k in self.__running and self._isValue(v):
+                self._setStats(res, k, self.__running[k].get_results())
+        return {"stats": res}
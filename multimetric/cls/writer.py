@@ -0,0 +1,39 @@
+import json
+
+
+class JsonResultWriter():
+    """
+    Writes a result dict to out while it is being built, the files one by one as they are added,
+    followed by the other sections on close. The document is the same
+    json.dump(result, out, ensure_ascii=False, indent=indent) would write for {"files": {...}, <sections>}
+    """
+
+    def __init__(self, out, indent=None):
+        self.__out = out
+        self.__indent = indent
+        if indent is None:
+            self.__sep = ", "
+            self.__level1 = ""
+            self.__level2 = ""
+        else:
+            self.__sep = ","
+            self.__level1 = "\n" + " " * indent
+            self.__level2 = "\n" + " " * (indent * 2)
+        self.__empty = True
+        self.__out.write("{" + self.__level1 + '"files": {')
+
+    def __dumps(self, value, level):
+        # Strings in JSON can't contain a raw newline, so every one of them is indentation
+        return json.dumps(value, ensure_ascii=False, indent=self.__indent).replace("\n", level)
+
+    def add_file(self, name, results):
+        self.__out.write(("" if self.__empty else self.__sep) + self.__level2 +
+                         self.__dumps(name, self.__level2) + ": " + self.__dumps(results, self.__level2))
+        self.__empty = False
+
+    def close(self, sections):
+        self.__out.write("}" if self.__empty else self.__level1 + "}")
+        for k, v in sections.items():
+            self.__out.write(self.__sep + self.__level1 + self.__dumps(k, self.__level1) + ": " +
+                             self.__dumps(v, self.__level1))
+        self.__out.write("\n}" if self.__indent is not None else "}")
@@ -1,22 +1,31 @@
 import argparse
+import collections
+import functools
+import hashlib
 import json
 import os
 import textwrap
 import multiprocessing as mp
 import fileinput
 
-import chardet
-from pygments import lexers
-
+from multimetric.cls.ast_engine import AstEngine
+from multimetric.cls.cache import cache_from_args
+from multimetric.cls.cache import get_versions
+from multimetric.cls.decode import decode_content
+from multimetric.cls.dispatch import TokenDispatcher
 from multimetric.cls.importer.filtered import FilteredImporter
 from multimetric.cls.importer.pick import importer_pick
+from multimetric.cls.lexer_cache import get_lexer
 from multimetric.cls.modules import get_additional_parser_args
 from multimetric.cls.modules import get_modules_calculated
 from multimetric.cls.modules import get_modules_metrics
 from multimetric.cls.modules import get_modules_stats
+from multimetric.cls.reader import FileTooLarge
+from multimetric.cls.reader import open_content
+from multimetric.cls.writer import JsonResultWriter
 
 
-def ArgParser():
+def ArgParser(argv=None):
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawTextHelpFormatter,
         prog="multimetric", description='Calculate code metrics in various languages',
@@ -77,6 +86,62 @@ def ArgParser():
         type=int,
         default=1,
         help="Run x jobs in parallel")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=0,
+        help="Number of files handed to a job at once, 0 picks a size from the number of files and jobs")
+    parser.add_argument(
+        "--cache-dir",
+        default=os.path.join(os.path.expanduser("~"), ".cache", "multimetric"),
+        help="Directory for caching the results of unchanged files")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=512,
+        help="Maximum size of the result cache in MiB, least recently used results are evicted")
+    parser.add_argument(
+        "--no-cache",
+        default=False,
+        action="store_true",
+        help="Don't read or write the result cache")
+    parser.add_argument(
+        "--no-dedup",
+        default=False,
+        action="store_true",
+        help="Process every file, also those with the same content as another file of the run")
+    parser.add_argument(
+        "--mmap-threshold",
+        type=int,
+        default=1024,
+        help="Memory map files of at least this many KiB instead of reading them into memory, 0 reads all files")
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=16,
+        help="Skip files larger than this many MiB, their results only hold the reason they were skipped.\n"
+             "0 processes files of any size")
+    parser.add_argument(
+        "--detect-limit",
+        type=int,
+        default=65536,
+        help="Number of bytes used to guess the encoding of files that aren't UTF-8, 0 uses the whole file")
+    parser.add_argument(
+        "--language",
+        default=None,
+        help="Parse all files with the lexer of this language (e.g. Python) instead of picking one by filename")
+    parser.add_argument(
+        "--engine",
+        choices=["tokens", "ast"],
+        default="tokens",
+        help="Compute the metrics of Python files from the token stream or from the syntax tree.\n"
+             "Files that can't be parsed into a syntax tree fall back to the token stream")
+    parser.add_argument(
+        "--scope-depth",
+        type=int,
+        default=0,
+        help="With --engine ast, add a breakdown per class and function nested up to this depth\n"
+             "to the results of each file, 0 disables the breakdown")
 
     #tr addition
     parser.add_argument('files', metavar='FILE', nargs='*', help='files to read, if empty, stdin is used')
@@ -84,98 +149,230 @@ def ArgParser():
     get_additional_parser_args(parser)
     #tr comment out# parser.add_argument("files", nargs='+', help="Files to parse")
     
-    RUNARGS = parser.parse_args()
+    RUNARGS = parser.parse_args(argv)
     return RUNARGS
     
 
-def file_process(_file, _args, _importer):
+def file_process(_file, _args, _importer, _content=None):
     res = {}
-    _lexer = lexers.get_lexer_for_filename(_file)
+    state = []
+    _lexer = get_lexer(_file, _args.language)
+    # Results depending on imported findings can't be reused
+    _cache = cache_from_args(_args) if not _importer else None
     try:
-        with open(_file, "rb") as i:
-            _cnt = i.read()
-            _enc = chardet.detect(_cnt)
-            _cnt = _cnt.decode(_enc["encoding"]).encode("utf-8")
+        # The raw content is only needed to look up the cache and to decode it, it is released afterwards
+        with open_content(_file, _content, _args.mmap_threshold * 1024, _args.max_file_size * 1024 * 1024) as _cnt:
+            if _cache:
+                _key = _cache.key(_cnt, _lexer.name)
+                _cached = _cache.get(_key)
+                if _cached is not None:
+                    return (_cached[0], _file, _lexer.name, _cached[1])
+            _text, _enc, _decoder = decode_content(_cnt, _args.detect_limit)
         _localImporter = {k: FilteredImporter(
             v, _file) for k, v in _importer.items()}
-        tokens = list(_lexer.get_tokens(_cnt))
+        tokens = _lexer.get_tokens(_text)
         if _args.dump:
             for x in tokens:
                 print("{}: {} -> {}".format(_file, x[0], str(x[1])))
         else:
             _localMetrics = get_modules_metrics(_args, **_localImporter)
             _localCalc = get_modules_calculated(_args, **_localImporter)
+            _states = None
+            if _args.engine == "ast" and _lexer.name == AstEngine.LANGUAGE:
+                try:
+                    _engine = AstEngine(_text)
+                    _states = _engine.get_states()
+                except (SyntaxError, ValueError, RecursionError):
+                    pass
+            if _states is not None:
+                for x in _localMetrics:
+                    x.merge_state(_states[type(x)])
+            else:
+                TokenDispatcher(_lexer.name, _localMetrics).parse_tokens(tokens)
             for x in _localMetrics:
-                x.parse_tokens(_lexer.name, tokens)
                 res.update(x.get_results())
             for x in _localCalc:
                 res.update(x.get_results(res))
+            res.update({"encoding": _enc, "decoder": _decoder,
+                        "engine": "ast" if _states is not None else "tokens"})
+            if _states is not None and _args.scope_depth > 0:
+                res["scopes"] = _engine.get_scopes(_args.scope_depth)
+            state = [x.get_state() for x in _localMetrics]
+            if _cache:
+                _cache.put(_key, (res, state))
+    except FileTooLarge as e:
+        # Not worth tokenizing, the reason is kept in the results of the file
+        res = {"skipped": str(e)}
+        state = []
     except Exception:
-        tokens = []
-    return (res, _file, _lexer.name, tokens)
+        state = []
+    return (res, _file, _lexer.name, state)
 
-# mm_interface(file)
-#
-# TR addition to multimetric to interface with Analyzer. Almost the same as the previous main.
-# Calculates the metrics from one file listing a grouping of files sorted by round and the amount of unit test fails
-# 
-# file: Links to one file containing the names of input files for the current set of submissions (one round/X unit test fails)
 
-def mm_interface(file):
-    _args = ArgParser()
+def _file_process_indexed(_item, _args, _importer):
+    _index, _entry = _item
+    if isinstance(_entry, tuple):
+        # In memory (name, content) pair
+        return (_index, file_process(_entry[0], _args, _importer, _content=_entry[1]))
+    return (_index, file_process(_entry, _args, _importer))
 
-    with open(file, 'r') as f:
-       filelist = []
-       for line in f:
-            filename = 'datadump/' + line.rstrip()
-            filelist.append(filename) #remove trailing newline from each line
-  
-    _args.files = [os.path.abspath(x) for x in filelist]
 
+_worker = {}
 
-    _result = {"files": {}, "overall": {}}
-    
-    # Get importer
-    _importer = {}
-    # sanity check
-    _importer = {k: v for k, v in _importer.items() if v}
 
-    # instance metric modules
-    _overallMetrics = get_modules_metrics(_args, **_importer)
-    _overallCalc = get_modules_calculated(_args, **_importer)
+def _init_worker(_args, _importer):
+    # Runs once in every process of a pool from make_pool
+    _worker["args"] = _args
+    _worker["importer"] = _importer
 
-    with mp.Pool(processes=_args.jobs) as pool:
-        results = [pool.apply(file_process, args=(
-            f, _args, _importer)) for f in _args.files]
 
-    for x in results:
-        _result["files"][x[1]] = x[0]
-        for y in _overallMetrics:
-            y.parse_tokens(x[2], x[3])
-            _result["overall"].update(y.get_results())
-    if not _args.dump:
-        for x in _overallCalc:
-            _result["overall"].update(x.get_results(_result["overall"]))
-        for m in get_modules_stats(_args, **_importer):
-            _result = m.get_results(_result, "files", "overall")
+def _file_process_worker(_item):
+    return _file_process_indexed(_item, _worker["args"], _worker["importer"])
 
-    # Craft the filename for the output from the input-filename
-    file_pieces = file.rsplit('/',1) # Separate path to the file from the filename
-    filename_pieces = file_pieces[1].rsplit('.',1) # Remove '.txt' from the end of the filename
-    back_one_dir = file_pieces[0].rsplit('/',1) # remove '/filelists/' from the path
-    
-    outputfile = back_one_dir[0] + '/results/' + filename_pieces[0] + '-results.json'
 
-    with open(outputfile, 'w', encoding='utf-8') as f:
-        json.dump(_result, f, ensure_ascii=False, indent=2)
+def make_pool(_args, _importer):
+    """
+    Starts a pool of _args.jobs processes for iter_files.
+    The options and importers are handed to each process once, without the files,
+    so a task only carries the index and the entry of its file
+    """
+    _options = argparse.Namespace(**{k: v for k, v in vars(_args).items() if k != "files"})
+    return mp.Pool(processes=_args.jobs, initializer=_init_worker, initargs=(_options, _importer))
 
 
+def _get_chunksize(_args, _count, per_job):
+    if _args.chunksize > 0:
+        return _args.chunksize
+    return max(1, _count // (_args.jobs * per_job))
+
+
+def _get_content_key(_entry, _args):
+    # Files with the same key get the same results, None if the file can't be compared
+    try:
+        _lexer = get_lexer(_get_name(_entry), _args.language)
+        with open_content(_get_name(_entry), _entry[1] if isinstance(_entry, tuple) else None,
+                          _args.mmap_threshold * 1024, _args.max_file_size * 1024 * 1024) as _content:
+            return (_lexer.name, hashlib.sha1(_content).digest())
+    except Exception:
+        return None
+
+
+def dedup_files(_args, _importer):
+    """
+    Finds the entries of _args.files with the same content, so each content is processed once.
+    Returns the entries to process and, for every entry of _args.files, the index of the entry
+    to process whose results it gets.
+    Entries are compared by the lexer picked for them and a hash of their content.
+    Results depending on imported findings are per file, with importers or --dump nothing is deduplicated
+    """
+    if _importer or _args.dump or _args.no_dedup:
+        return (list(_args.files), list(range(len(_args.files))))
+    _unique = []
+    _copies = []
+    _seen = {}
+    for _entry in _args.files:
+        _key = _get_content_key(_entry, _args)
+        if _key not in _seen:
+            if _key is not None:
+                _seen[_key] = len(_unique)
+            _copies.append(len(_unique))
+            _unique.append(_entry)
+        else:
+            _copies.append(_seen[_key])
+    return (_unique, _copies)
 
-def main():
-    _args = ArgParser()
-    _result = {"files": {}, "overall": {}}
 
-    # Get importer
+def _iter_processed(_args, _importer, files, per_job, pool):
+    # file_process results of files in order, see iter_files
+    if _args.jobs <= 1:
+        _func = functools.partial(_file_process_indexed, _args=_args, _importer=_importer)
+        for _, x in map(_func, enumerate(files)):
+            yield x
+    elif pool is None:
+        with make_pool(_args, _importer) as pool:
+            yield from _iter_processed(_args, _importer, files, per_job, pool)
+    else:
+        _pending = {}
+        _next = 0
+        for i, x in pool.imap_unordered(_file_process_worker, enumerate(files),
+                                        chunksize=_get_chunksize(_args, len(files), per_job)):
+            _pending[i] = x
+            while _next in _pending:
+                yield _pending.pop(_next)
+                _next += 1
+
+
+def iter_files(_args, _importer, per_job=4, pool=None, counts=None):
+    """
+    Runs file_process for every file in _args.files, spread over _args.jobs processes.
+    Entries of _args.files are either paths or (name, content) pairs.
+    Results are yielded in the order of _args.files, as soon as the jobs got that far;
+    only results that finished early are held back.
+    Files with the same content are processed once, see dedup_files. The results are
+    handed out to each of them, under their own name.
+    Unless --chunksize is given, the files are handed out in about per_job chunks per job
+    (like Pool.map does with its default of 4).
+    A pool started by make_pool for the same options can be passed in, otherwise one is started for this run.
+    If counts is a dict, the number of files and of distinct contents processed are put into it
+    """
+    _unique, _copies = dedup_files(_args, _importer)
+    if counts is not None:
+        counts.update({"files": len(_copies), "unique": len(_unique)})
+    # Results are kept until the last file sharing them got them
+    _refs = [0] * len(_unique)
+    for i in _copies:
+        _refs[i] += 1
+    _done = {}
+    _next = 0
+    for i, x in enumerate(_iter_processed(_args, _importer, _unique, per_job, pool)):
+        _done[i] = x
+        while _next < len(_copies) and _copies[_next] in _done:
+            _index = _copies[_next]
+            x = _done[_index]
+            _refs[_index] -= 1
+            if not _refs[_index]:
+                del _done[_index]
+            _name = _get_name(_args.files[_next])
+            yield x if x[1] == _name else (x[0], _name, x[2], x[3])
+            _next += 1
+    _cache = cache_from_args(_args) if not _importer else None
+    if _cache:
+        _cache.prune()
+
+
+def run_files(_args, _importer, per_job=4, pool=None):
+    """
+    Returns the results of iter_files as a list
+    """
+    return list(iter_files(_args, _importer, per_job, pool))
+
+
+def merge_file(_overallMetrics, result):
+    """
+    Merges the metric states returned by file_process for one file into the overall metrics
+    """
+    if result[3]:
+        for y, state in zip(_overallMetrics, result[3]):
+            y.merge_state(state)
+    else:
+        # Nothing could be parsed from this file
+        for y in _overallMetrics:
+            y.parse_tokens(result[2], [])
+
+
+def merge_overall(_overallMetrics, results, overall):
+    """
+    Merges the metric states returned by file_process into the overall metrics
+    """
+    for x in results:
+        merge_file(_overallMetrics, x)
+    for y in _overallMetrics:
+        overall.update(y.get_results())
+
+def get_importers(_args):
+    """
+    Returns the importers for the findings files given in _args
+    """
     _importer = {}
     _importer["import_compiler"] = importer_pick(_args, _args.warn_compiler)
     _importer["import_coverage"] = importer_pick(_args, _args.coverage)
@@ -187,26 +384,410 @@ def main():
     _importer["import_standard"] = importer_pick(_args, _args.warn_security)
     # sanity check
     _importer = {k: v for k, v in _importer.items() if v}
+    return _importer
+
+
+def build_result(_args, _importer, results):
+    """
+    Builds the result dict (files, overall and stats) from file_process results
+    """
+    _result = {"files": {}, "overall": {}}
 
     # instance metric modules
     _overallMetrics = get_modules_metrics(_args, **_importer)
     _overallCalc = get_modules_calculated(_args, **_importer)
 
-    with mp.Pool(processes=_args.jobs) as pool:
-        results = [pool.apply(file_process, args=(
-            f, _args, _importer)) for f in _args.files]
-
     for x in results:
         _result["files"][x[1]] = x[0]
-        for y in _overallMetrics:
-            y.parse_tokens(x[2], x[3])
-            _result["overall"].update(y.get_results())
+    merge_overall(_overallMetrics, results, _result["overall"])
     if not _args.dump:
         for x in _overallCalc:
             _result["overall"].update(x.get_results(_result["overall"]))
         for m in get_modules_stats(_args, **_importer):
             _result = m.get_results(_result, "files", "overall")
+    return _result
+
+class StreamingResult():
+    """
+    Counterpart of build_result that writes the result as JSON to out while the file results come in.
+    Only the overall metric states and the values the stats are calculated from are kept,
+    not the results of the files.
+
+    The overall lines of code are those of the file merged last. If the results come in another
+    order than the files were given, last names the file to merge last, so the overall is the same.
+    If that file is given last_count times, the earlier ones are merged as they come in.
+
+    Like in build_result, a file given more than once is merged into the overall every time,
+    but written and counted in the stats once.
+
+    The files are written in the order the results come in, or in the order of the names in order.
+    Then the results of files that come in early are held back until the files before them are written
+    """
 
+    def __init__(self, _args, _importer, out, indent=None, last=None, last_count=1, order=None):
+        self.__args = _args
+        self.__importer = _importer
+        self.__overallMetrics = get_modules_metrics(_args, **_importer)
+        self.__stats = get_modules_stats(_args, **_importer)
+        self.__writer = JsonResultWriter(out, indent)
+        self.__count = 0
+        self.__names = set()
+        self.__last = last
+        self.__lastLeft = last_count
+        self.__held = None
+        self.__order = order
+        self.__next = 0
+        self.__early = {}
+
+    def add(self, result):
+        if result[1] not in self.__names:
+            self.__names.add(result[1])
+            if self.__order is None:
+                self.__writer.add_file(result[1], result[0])
+            else:
+                self.__early[result[1]] = result[0]
+                self.__write_early()
+            for m in self.__stats:
+                m.add(result[0])
+            self.__count += 1
+        if result[1] == self.__last:
+            self.__lastLeft -= 1
+        if result[1] == self.__last and not self.__lastLeft:
+            self.__held = result
+        else:
+            merge_file(self.__overallMetrics, result)
+
+    def __write_early(self):
+        while self.__next < len(self.__order) and self.__order[self.__next] in self.__early:
+            _name = self.__order[self.__next]
+            self.__writer.add_file(_name, self.__early.pop(_name))
+            self.__next += 1
+
+    def close(self):
+        for k, v in self.__early.items():
+            # Results of files missing from order
+            self.__writer.add_file(k, v)
+        self.__early.clear()
+        if self.__held is not None:
+            merge_file(self.__overallMetrics, self.__held)
+        _overall = {}
+        for y in self.__overallMetrics:
+            _overall.update(y.get_results())
+        for x in get_modules_calculated(self.__args, **self.__importer):
+            _overall.update(x.get_results(_overall))
+        _sections = {"overall": _overall}
+        for m in self.__stats:
+            _sections.update(m.get_stream_results(_overall, self.__count))
+        self.__writer.close(_sections)
+
+
+class MetricSession():
+    """
+    Library entry point, configured with explicit options instead of a command line.
+    Options are the long command line options with underscores (e.g. engine="ast", no_cache=True).
+    With more than one job the worker processes are started once and reused by every run,
+    call close() or use the session as a context manager to stop them.
+
+    Files are given as paths or as (name, content) pairs of a name and the raw bytes
+    """
+
+    def __init__(self, jobs=1, **options):
+        self.__args = ArgParser([])
+        for k, v in options.items():
+            if k == "files" or not hasattr(self.__args, k):
+                raise ValueError("Unknown option: {}".format(k))
+            setattr(self.__args, k, v)
+        self.__args.jobs = jobs
+        self.__importer = get_importers(self.__args)
+        self.__pool = None
+        self.__counts = {"files": 0, "unique": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __get_pool(self):
+        if self.__args.jobs > 1 and self.__pool is None:
+            self.__pool = make_pool(self.__args, self.__importer)
+        return self.__pool
+
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def counts(self):
+        """
+        Returns the number of files of the last run and the number of distinct contents among them,
+        only the latter were processed (see dedup_files)
+        """
+        return (self.__counts["files"], self.__counts["unique"])
+
+    def run(self, files, per_job=4):
+        """
+        Returns the file_process results of files, in the same order
+        """
+        self.__args.files = list(files)
+        return list(iter_files(self.__args, self.__importer, per_job, self.__get_pool(), self.__counts))
+
+    def analyze(self, files):
+        """
+        Returns the result dict (files, overall and stats) for files
+        """
+        return build_result(self.__args, self.__importer, self.run(files))
+
+    def write(self, files, out, indent=None):
+        """
+        Writes the result dict for files as JSON to out, see StreamingResult
+        """
+        self.__args.files = list(files)
+        _stream = StreamingResult(self.__args, self.__importer, out, indent)
+        for x in iter_files(self.__args, self.__importer, pool=self.__get_pool(), counts=self.__counts):
+            _stream.add(x)
+        _stream.close()
+
+    def __iter_groups(self, groups):
+        # The files of all groups in a single run, largest first, so no job is left with a big file at the end.
+        # Yields the groups each result belongs to along with the result
+        _members = {}
+        for k, v in groups.items():
+            for x in v:
+                _members.setdefault(x, []).append(k)
+        self.__args.files = sorted(_members, key=lambda x: (-_get_size(x), _get_name(x)))
+        for _entry, x in zip(self.__args.files, iter_files(self.__args, self.__importer, 16, self.__get_pool(), self.__counts)):
+            yield (_members[_entry], x)
+
+    def analyze_groups(self, groups):
+        """
+        Returns a dict of result dicts, one for each name of the {name: files} dict groups.
+        The files of all groups are processed in a single run
+        """
+        results = {k: [] for k in groups}
+        for _names, x in self.__iter_groups(groups):
+            for k in _names:
+                results[k].append(x)
+        return {k: build_result(self.__args, self.__importer, v) for k, v in results.items()}
+
+    def write_groups(self, groups, outputs, indent=None):
+        """
+        Like analyze_groups, but writes the result dict of each group as JSON to outputs[name]
+        while the results come in, see StreamingResult.
+        An output is either a stream or the path of a file, see ResultFiles.
+        The files are processed largest first, but written in the order they are given in the group.
+        A group is closed as soon as the last of its files is done
+        """
+        _files = ResultFiles()
+        _streams = {}
+        _left = {k: len(v) for k, v in groups.items()}
+
+        def _get_stream(k):
+            if k not in _streams:
+                _out = outputs[k]
+                if isinstance(_out, str):
+                    _out = _files.output(_out)
+                _streams[k] = StreamingResult(self.__args, self.__importer, _out, indent,
+                                              last=_get_name(groups[k][-1]) if groups[k] else None,
+                                              last_count=groups[k].count(groups[k][-1]) if groups[k] else 1,
+                                              order=list(dict.fromkeys(_get_name(x) for x in groups[k])))
+            return _streams[k]
+
+        def _close(k):
+            _get_stream(k).close()
+            del _streams[k]
+            if isinstance(outputs[k], str):
+                _files.commit(outputs[k])
+
+        try:
+            for _names, x in self.__iter_groups(groups):
+                for k in _names:
+                    _get_stream(k).add(x)
+                    _left[k] -= 1
+                    if not _left[k]:
+                        _close(k)
+            for k, v in groups.items():
+                if not v:
+                    _close(k)
+        finally:
+            _files.discard()
+
+
+class ResultFiles():
+    """
+    File outputs of MetricSession.write_groups. Each result is written to <path>.tmp and moved to path
+    once it is complete, so an interrupted run never leaves a truncated result behind.
+    At most max_open files are open at once, the one written to least recently is closed
+    and opened again to append when needed
+    """
+
+    def __init__(self, max_open=32):
+        self.__max_open = max_open
+        self.__open = collections.OrderedDict()
+        self.__started = set()
+
+    def output(self, path):
+        """
+        Returns a stream writing to path
+        """
+        return _ResultFile(self, path)
+
+    def write(self, path, text):
+        _file = self.__open.get(path)
+        if _file is None:
+            if len(self.__open) >= self.__max_open:
+                self.__open.popitem(last=False)[1].close()
+            _file = open(path + ".tmp", "a" if path in self.__started else "w", encoding="utf-8")
+            self.__started.add(path)
+            self.__open[path] = _file
+        else:
+            self.__open.move_to_end(path)
+        _file.write(text)
+
+    def commit(self, path):
+        """
+        Moves the complete result into place
+        """
+        _file = self.__open.pop(path, None)
+        if _file is not None:
+            _file.close()
+        self.__started.discard(path)
+        os.replace(path + ".tmp", path)
+
+    def discard(self):
+        """
+        Removes the results that were not committed
+        """
+        for _file in self.__open.values():
+            _file.close()
+        self.__open.clear()
+        for path in self.__started:
+            try:
+                os.remove(path + ".tmp")
+            except OSError:
+                pass
+        self.__started.clear()
+
+
+class _ResultFile():
+    def __init__(self, files, path):
+        self.__files = files
+        self.__path = path
+
+    def write(self, text):
+        self.__files.write(self.__path, text)
+
+
+def _get_name(_entry):
+    return _entry[0] if isinstance(_entry, tuple) else _entry
+
+
+def _get_size(_entry):
+    if isinstance(_entry, tuple):
+        return len(_entry[1])
+    try:
+        return os.path.getsize(_entry)
+    except OSError:
+        return 0
+
+# submission_paths(dir, files)
+#
+# Returns the absolute paths of submissions given relative to the data directory, like in the CSV files
+#
+# dir: the data directory of the Analyzer
+# files: the submission filenames
+
+def submission_paths(dir, files):
+    return [os.path.abspath(os.path.join(dir, x)) for x in files]
+
+# read_filelist(file, dir)
+#
+# Reads the submission filenames from one filelist written by the Analyzer
+#
+# file: the filelist
+# dir: the data directory the submission filenames are relative to. By default the one the filelist was
+#      written for, the filelists of <dir> are in <dir>-analysis/metrics/<round>/filelists/
+
+def read_filelist(file, dir=None):
+    if dir is None:
+        dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(file)))))
+        if not dir.endswith('-analysis'):
+            raise ValueError('Not a filelist of the Analyzer, the data directory has to be given: ' + file)
+        dir = dir[:-len('-analysis')]
+    with open(file, 'r') as f:
+        return submission_paths(dir, [line.rstrip() for line in f]) #remove trailing newline from each line
+
+# result_filename(file)
+#
+# Returns the name of the results file for one filelist, in the results directory next to the filelists directory
+#
+# file  : the filelist
+
+def result_filename(file):
+    # Craft the filename for the output from the input-filename
+    file_pieces = file.rsplit('/',1) # Separate path to the file from the filename
+    filename_pieces = file_pieces[1].rsplit('.',1) # Remove '.txt' from the end of the filename
+    back_one_dir = file_pieces[0].rsplit('/',1) # remove '/filelists/' from the path
+    
+    return back_one_dir[0] + '/results/' + filename_pieces[0] + '-results.json'
+
+# mm_version()
+#
+# Returns the version tags of multimetric, they change whenever the code of multimetric, Pygments or Python changes
+
+def mm_version():
+    return get_versions()
+
+# mm_interface(file,indent)
+#
+# TR addition to multimetric to interface with Analyzer. Almost the same as the previous main.
+# Calculates the metrics from one file listing a grouping of files sorted by round and the amount of unit test fails
+# 
+# file: Links to one file containing the names of input files for the current set of submissions (one round/X unit test fails)
+# indent: indentation of the JSON results, None writes them compact
+
+def mm_interface(file, indent=2):
+    with MetricSession() as session, open(result_filename(file), 'w', encoding='utf-8') as f:
+        session.write(read_filelist(file), f, indent)
+
+# mm_groups(groups,jobs,indent)
+#
+# Calculates the metrics for many groups of submissions, e.g. all fail groups of all rounds of a course, in one go.
+# All submissions go into one work queue for one pool of jobs, see MetricSession.write_groups.
+# The results of each group are written to its own file as they come in, and only moved into place once complete.
+#
+# groups    : dict of results filename -> paths of the submissions of the group, see submission_paths
+# jobs      : how many jobs to run in parallel
+# indent    : indentation of the JSON results, None writes them compact
+# options   : further options of MetricSession, e.g. cache_dir or no_cache
+#
+# Returns the number of submissions and the number of distinct contents among them, see MetricSession.counts
+
+def mm_groups(groups, jobs=1, indent=2, **options):
+    with MetricSession(jobs, **options) as session:
+        session.write_groups(groups, {file: file for file in groups}, indent)
+        return session.counts()
+
+# mm_course(filelists,jobs,indent)
+#
+# Like mm_groups, for filelists written by the Analyzer. The results are written per filelist like mm_interface does.
+#
+# filelists : the filelists to process
+# jobs      : how many jobs to run in parallel
+# indent    : indentation of the JSON results, None writes them compact
+
+def mm_course(filelists, jobs=1, indent=2):
+    return mm_groups({result_filename(file): read_filelist(file) for file in filelists}, jobs, indent)
+
+
+def main():
+    _args = ArgParser()
+    _importer = get_importers(_args)
+
+    results = run_files(_args, _importer)
+    _result = build_result(_args, _importer, results)
+    if not _args.dump:
         # Output
         print(json.dumps(_result, indent=2, sort_keys=True))
         
@@ -25,6 +25,9 @@ setuptools.setup(
     url="https://github.com/priv-kweihmann/multimetric",
     packages=setuptools.find_packages(),
     install_requires=requirements,
+    extras_require={
+        "numpy": ["numpy"],
+    },
         entry_points={
         "console_scripts": [
             "multimetric = multimetric.__main__:main",
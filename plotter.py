@@ -1,308 +1,421 @@
-import matplotlib
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from pathlib import Path
-import json, os
-import numpy as np
-
-def autolabel(rects,ax):
-    """Attach a text label above each bar in *rects*, displaying its height."""
-    for rect in rects:
-        height = rect.get_height()
-        ax.annotate('{}'.format(height),
-                    xy=(rect.get_x() + rect.get_width() / 2, height),
-                    xytext=(0, 2),  
-                    textcoords="offset points",
-                    ha='center', va='bottom', rotation=0)
-        
-#####
-#
-# overview_plot(dir,data,round,metric)
-#
-# dir    : Directory of the main result data repository, used for the savefile name
-# data   : The array of data to be plotted
-# round  : Name of the round, used for labels.
-# metric : the metric being plotted, used for labels
-#
-# Plots overview of the metric from data [maxes, means, medians, mins]
-       
- 
-def overview_plot(dir,data,round,metric):    
-    labels = []
-    for count,line in enumerate(data[0]):
-        labels.append(str(count) + ' fails')
-    x = np.arange(len(labels))  # the label locations
-    width = 0.20  # the width of the bars
-
-    fig, ax = plt.subplots()
-    rects1 = ax.bar(x - width*3/2, data[0], width, label='Max')
-    rects2 = ax.bar(x - width/2, data[1], width, label='Mean')
-    rects3 = ax.bar(x + width/2, data[2], width, label='Median')
-    rects4 = ax.bar(x + width*3/2, data[3], width, label='Min')
-
-    # Add some text for labels, title and custom x-axis tick labels, etc.
-    ax.set_ylabel(metric)
-    ax.set_xlabel('Amount of failed unit tests')
-    ax.set_title('Overview of ' + metric + ' in the round ' + round)
-    ax.set_xticks(x)
-    ax.set_xticklabels(labels)
-    ax.legend()
-
-    autolabel(rects1,ax)
-    autolabel(rects2,ax)
-    autolabel(rects3,ax)
-    autolabel(rects4,ax)
-
-    fig.tight_layout()
-    savefile = dir + '/plots/' + round + '/overall_' + round + '_' + metric
-    plt.savefig(savefile)
-    plt.close()
-
-#####
-# overall_metric_data(dir,metric)
-#
-# dir: the directory with the data
-# metric: name of the metric being collected
-#
-# Reads multimetric results from a directory and compiles overall metrics data
-# This result is used to plot out an overview of one round, consisting of the results for each individual amount of errors in
-#
-# If more than 10 unit tests, files may not be in numerical order and ALL metrics will be screwed. TODO!
-
-def overall_metric_data(dir,metric):
-    data,mins,maxes,means,medians = [],[],[],[],[]
-    for filename in os.listdir(dir):
-        with open(os.path.join(dir, filename), 'r') as f: # open all result files and add their contents to data
-            data.append(json.load(f))
-            
-    for line in data: # combine mins,maxes,means,medians data from all result files
-        maxes.append(line['stats']['max'][metric])
-        means.append(line['stats']['mean'][metric])
-        medians.append(line['stats']['median'][metric])
-        mins.append(line['stats']['min'][metric])
-
-    return np.round([maxes,means,medians,mins],2) #round to 2 decimals
-
-#####
-# distribution(metric,fie)
-#
-# metric: The metric the distribution array is to be created of
-# file  : Filename of the result group
-#
-# Creates a sorted array of the distribution of metric values over one file (the metric results 
-# of one round of submissions with X errors on one task)
-#
-#
-
-def distribution(metric,file):
-    with open(file, 'r') as f:
-        data = json.load(f)       
-        distribution = list()
-        for x in data['files']: # Individual submission data is stored in data['files']
-            distribution.append(data['files'][x][metric])
-    distribution.sort()
-    return distribution
-
-######
-# histo_plot(dir,buckets,metric,round)
-#
-# dir       : Directory containing the json data files (*datadump*-analysis/metrics/*round*/results/)
-# buckets   : How many buckets the histogram spreads the data in
-# metric    : Which metric is being drawn
-# round     : Name of the exercise round
-#
-# Plots one big histogram, side by side for all fail groups for one round
-
-def histo_plot(dir,buckets,metric,round):
-    fig,ax = plt.subplots()
-
-    number_of_files = len(os.listdir(dir))
-    data = [[] for i in range(number_of_files)]
-    labels = [[] for i in range(number_of_files)]
-
-    ax.set_title('Histogram distribution plot with ' + str(buckets) + ' buckets. \nRound: ' + round + ' Metric: ' + metric)
-    ax.set_ylabel('Amount of submissions')
-    ax.set_xlabel(metric)
-   
-    for i,file in enumerate(os.listdir(dir)):
-        filename = dir + '/'+ file # Name of one result file
-        data[i] = distribution(metric, filename)
-        labels[i] = str(i) + ' (subs: ' + str(len(data[i])) + ')'
-    
-    ax.hist(data,buckets,label=labels,alpha = 0.5,histtype='bar')
-
-    ax.legend(loc='upper right',title='Unit test fails')
- 
-    savefile = dir + '../../../plots/' + round + '/Overall_Histo_' + str(buckets) + '_' + round + '_' + metric
-    plt.savefig(savefile)
-    plt.close()
-
-    
-    
-
-######
-# abc_data(file)
-#
-# file: The filename for which ABC data is collected
-#
-# Collects ABC metric data from one file. Calculates the vector explosion field with the center point
-# being the endpoint of the median vector. Returns a triple list.
-
-def abc_data(file):
-    abc_data = [[] for i in range(3)] # three lists
-
-    with open(file, 'r') as f:
-        data = json.load(f)       
-        avg_a = data['stats']['median']['ABC_Assignments']
-        avg_b = data['stats']['median']['ABC_Branches']
-        avg_c = data['stats']['median']['ABC_Conditionals']
-        for x in data['files']: # Individual submission data is stored in data['files']
-            temp_a = data['files'][x]['ABC_Assignments'] - avg_a
-            temp_b = data['files'][x]['ABC_Branches'] - avg_b
-            temp_c = data['files'][x]['ABC_Conditionals'] - avg_c
-            
-            abc_data[0].append(temp_a)
-            abc_data[1].append(temp_b)
-            abc_data[2].append(temp_c)
-    
-    return abc_data
-
-######
-# abc_plot(dir,round)
-#
-# dir   : Directory where the .json data files are (*-analysis/metrics/*round*/results)
-# round : Name of the round
-#
-# Plot the ABC data in a vector explosion field with the origin being the median ABC vector
-# Takes in one round of exercises, containing multiple files with one file each for X amount of unit test failures
-
-def abc_plot(dir,round):
-    data = []
-    medians = []
-    start = []
-    tempdata = []
-
-    for file in os.listdir(dir):
-        filename = dir + '/' + file
-        #tempdata = abc_data(filename)
-        
-        abc_data    = [[] for i in range(3)] # three lists
-        median_data = [[] for i in range(3)]
-
-        with open(filename, 'r') as f:
-            filedata = json.load(f)       
-            avg_a = filedata['stats']['median']['ABC_Assignments']
-            avg_b = filedata['stats']['median']['ABC_Branches']
-            avg_c = filedata['stats']['median']['ABC_Conditionals']
-            for x in filedata['files']: # Individual submission data is stored in data['files']
-                temp_a = filedata['files'][x]['ABC_Assignments'] - avg_a
-                temp_b = filedata['files'][x]['ABC_Branches'] - avg_b
-                temp_c = filedata['files'][x]['ABC_Conditionals'] - avg_c
-            
-                
-                abc_data[0].append(temp_a)
-                abc_data[1].append(temp_b)
-                abc_data[2].append(temp_c)
-
-            median_data[0].append(avg_a)
-            median_data[1].append(avg_b)
-            median_data[2].append(avg_c)
-
-        medians.append(median_data)
-        data.append(abc_data)
-
-    # data now contains one list member for each file of unit test fails, each with a triple list with A, B and C values
-    
-    for i,line in enumerate(data):    
-        X = [0] * len(line[0])
-        Y = [0] * len(line[0])
-        Z = [0] * len(line[0]) #The starting points of the vectors are always [0,0,0]
-        U = line[0]
-        V = line[1]
-        W = line[2]
-        
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
-        ax.quiver(X, Y, Z, U, V, W,arrow_length_ratio=0.1)
-        ax.set_xlim([min(U)-1, max(U)+1])
-        ax.set_ylim([min(V)-1, max(V)+1])
-        ax.set_zlim([min(W)-1, max(W)+1])
-
-        ax.set_xlabel('Assignment')
-        ax.set_ylabel('Branch')
-        ax.set_zlabel('Condition')
-
-        ax.set_title('Metric: ABC :: Round: ' + round + ' :: Fails: ' + str(i) + ' :: Submissions: ' + str(len(line[0])) + '\nStarting point[0,0,0] = median vector: ' + str(medians[i]))
-        savefile = dir + '../../../plots/' + round + '/ABC_' + round + '_' + str(i)
-        plt.savefig(savefile)
-        plt.close()
-    
-
-#####
-# plotter(dir)
-#
-# dir: base directory of the whole data result package (/directory-analysis/)
-#
-# Plots everything in the whole Analyzer project. If you need more/different plots, add them here
-# 
-
-def plotter(dir):
-    plt.rcParams.update({'figure.max_open_warning': 0}) # Stop pyplot throwing warnings about too many open plots
-
-    print('Drawing plots for round: ')
-    for round in os.listdir(dir + '/metrics'): # Rounds of exercises in the metric result directory
-        print('... ' + round)
-        Path(dir + '/plots/' + round ).mkdir(parents=True, exist_ok=True) # Create the plots - directory
-
-        dirname = dir + '/metrics/' + round + '/results/'
-
-        abc_plot(dirname, round)
-        
-            
-        histo_plot(dirname,10,'cyclomatic_complexity',round)
-        histo_plot(dirname,10,'halstead_bugprop',round)
-        histo_plot(dirname,10,'halstead_difficulty',round)
-        histo_plot(dirname,10,'halstead_effort',round)
-        histo_plot(dirname,10,'halstead_timerequired',round)
-        histo_plot(dirname,10,'halstead_volume',round)
-        
-        
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'cyclomatic_complexity')  
-        overview_plot(dir,data,round,'Cyclomatic Complexity')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'halstead_bugprop')                        
-        overview_plot(dir,data,round,'Halstead Bugs')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'halstead_difficulty')  
-        overview_plot(dir,data,round,'Halstead Difficulty')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'halstead_effort')
-        overview_plot(dir,data,round,'Halstead Effort')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'halstead_timerequired')
-        overview_plot(dir,data,round,'Halstead Time Required')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'halstead_volume')
-        overview_plot(dir,data,round,'Halstead Volume')
-        data = overall_metric_data((dir + '/metrics/' + round + '/results'), 'loc')               
-        overview_plot(dir,data,round,'Lines of Code')
-            
-###
-# main()
-#
-# Used for testing purposes during development. Analyzer calls plotter(dir) instead.
-#
-
-def main():
-
-    abc_plot('datadump-analysis/metrics/mauno-plot/results','mauno-plot')
-#    histo_plot('datadump-analysis/metrics/mauno-plot/results/',10,'cyclomatic_complexity','mauno-plot')
-    
-#    plotter('datadump-analysis')
-    
-
-#    dist = distribution('cyclomatic_complexity','mauno-plot/errors0result.txt')
-#    histogram_plot(dist,10,'cyclomatic_complexity','mauno-plot')
-
-#    dist = distribution('halstead_bugprop','errors0result.txt')
-#    histogram_plot(dist,10,'halstead_bugprop','rainfall')
-
-    
-if __name__ == "__main__":
-    main()
-
+import matplotlib
+matplotlib.use('Agg') # Plots are only saved to files, also keeps pool workers away from any display
+import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d import Axes3D
+from pathlib import Path
+import hashlib, json, os
+import multiprocessing as mp
+import numpy as np
+import resultstore
+
+ABC_METRICS = ['ABC_Assignments','ABC_Branches','ABC_Conditionals']
+HISTO_BUCKETS = 10
+HISTO_METRICS = ['cyclomatic_complexity','halstead_bugprop','halstead_difficulty','halstead_effort',
+                 'halstead_timerequired','halstead_volume']
+OVERVIEW_METRICS = [('cyclomatic_complexity','Cyclomatic Complexity'),('halstead_bugprop','Halstead Bugs'),
+                    ('halstead_difficulty','Halstead Difficulty'),('halstead_effort','Halstead Effort'),
+                    ('halstead_timerequired','Halstead Time Required'),('halstead_volume','Halstead Volume'),
+                    ('loc','Lines of Code')]
+
+def autolabel(rects,ax):
+    """Attach a text label above each bar in *rects*, displaying its height."""
+    for rect in rects:
+        height = rect.get_height()
+        ax.annotate('{}'.format(height),
+                    xy=(rect.get_x() + rect.get_width() / 2, height),
+                    xytext=(0, 2),  
+                    textcoords="offset points",
+                    ha='center', va='bottom', rotation=0)
+        
+#####
+#
+# overview_plot(dir,data,fails,round,metric)
+#
+# dir    : Directory of the main result data repository, used for the savefile name
+# data   : The array of data to be plotted
+# fails  : The amount of failed unit tests of each fail group in data, used for labels
+# round  : Name of the round, used for labels.
+# metric : the metric being plotted, used for labels
+#
+# Plots overview of the metric from data [maxes, means, medians, mins]
+       
+ 
+def overview_plot(dir,data,fails,round,metric):    
+    labels = []
+    for count in fails:
+        labels.append(str(count) + ' fails')
+    x = np.arange(len(labels))  # the label locations
+    width = 0.20  # the width of the bars
+
+    fig, ax = plt.subplots()
+    rects1 = ax.bar(x - width*3/2, data[0], width, label='Max')
+    rects2 = ax.bar(x - width/2, data[1], width, label='Mean')
+    rects3 = ax.bar(x + width/2, data[2], width, label='Median')
+    rects4 = ax.bar(x + width*3/2, data[3], width, label='Min')
+
+    # Add some text for labels, title and custom x-axis tick labels, etc.
+    ax.set_ylabel(metric)
+    ax.set_xlabel('Amount of failed unit tests')
+    ax.set_title('Overview of ' + metric + ' in the round ' + round)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels)
+    ax.legend()
+
+    autolabel(rects1,ax)
+    autolabel(rects2,ax)
+    autolabel(rects3,ax)
+    autolabel(rects4,ax)
+
+    fig.tight_layout()
+    savefile = dir + '/plots/' + round + '/overall_' + round + '_' + metric
+    plt.savefig(savefile)
+    plt.close()
+
+#####
+# overall_metric_data(store,metric)
+#
+# store: the columnar store of the round, see resultstore.load_store
+# metric: name of the metric being collected
+#
+# Compiles overall metrics data from the stats of every result file of the round, ordered by the amount of failed unit tests
+# This result is used to plot out an overview of one round, consisting of the results for each individual amount of errors in
+
+def overall_metric_data(store,metric):
+    maxes = resultstore.group_stat(store,'max',metric)
+    means = resultstore.group_stat(store,'mean',metric)
+    medians = resultstore.group_stat(store,'median',metric)
+    mins = resultstore.group_stat(store,'min',metric)
+
+    return np.round([maxes,means,medians,mins],2) #round to 2 decimals
+
+#####
+# distribution(metric,store,group)
+#
+# metric: The metric the distribution array is to be created of
+# store : the columnar store of the round, see resultstore.load_store
+# group : Index of the result group in the store
+#
+# Creates a sorted array of the distribution of metric values over one file (the metric results 
+# of one round of submissions with X errors on one task)
+#
+#
+
+def distribution(metric,store,group):
+    return np.sort(resultstore.column(store,metric,group)).tolist()
+
+######
+# histo_plot(dir,store,buckets,metric,round)
+#
+# dir       : Directory containing the json data files (*datadump*-analysis/metrics/*round*/results/)
+# store     : The columnar store of the round, see resultstore.load_store
+# buckets   : How many buckets the histogram spreads the data in
+# metric    : Which metric is being drawn
+# round     : Name of the exercise round
+#
+# Plots one big histogram, side by side for all fail groups for one round
+
+def histo_plot(dir,store,buckets,metric,round):
+    fig,ax = plt.subplots()
+
+    number_of_files = len(store['groups'])
+    data = [[] for i in range(number_of_files)]
+    labels = [[] for i in range(number_of_files)]
+
+    ax.set_title('Histogram distribution plot with ' + str(buckets) + ' buckets. \nRound: ' + round + ' Metric: ' + metric)
+    ax.set_ylabel('Amount of submissions')
+    ax.set_xlabel(metric)
+   
+    for i in range(number_of_files):
+        data[i] = distribution(metric, store, i)
+        labels[i] = str(store['fails'][i]) + ' (subs: ' + str(len(data[i])) + ')'
+    
+    ax.hist(data,buckets,label=labels,alpha = 0.5,histtype='bar')
+
+    ax.legend(loc='upper right',title='Unit test fails')
+ 
+    savefile = dir + '../../../plots/' + round + '/Overall_Histo_' + str(buckets) + '_' + round + '_' + metric
+    plt.savefig(savefile)
+    plt.close()
+
+    
+    
+
+######
+# abc_data(store,group)
+#
+# store: The columnar store of the round, see resultstore.load_store
+# group: Index of the result group for which ABC data is collected
+#
+# Collects ABC metric data from one result group. Calculates the vector explosion field with the center point
+# being the endpoint of the median vector. Returns a triple list and the median vector.
+
+def abc_data(store,group):
+    abc_data = [[] for i in range(3)] # three lists
+    medians = []
+
+    for i,metric in enumerate(ABC_METRICS):
+        median = resultstore.group_stat(store,'median',metric)[group].item()
+        abc_data[i] = (resultstore.column(store,metric,group) - median).tolist()
+        medians.append(median)
+    
+    return abc_data,medians
+
+######
+# abc_plot(dir,store,round,groups)
+#
+# dir   : Directory where the .json data files are (*-analysis/metrics/*round*/results)
+# store : The columnar store of the round, see resultstore.load_store
+# round : Name of the round
+# groups: Indices of the fail groups to plot, all if None
+#
+# Plot the ABC data in a vector explosion field with the origin being the median ABC vector
+# Takes in one round of exercises, containing multiple files with one file each for X amount of unit test failures
+
+def abc_plot(dir,store,round,groups=None):
+    data = []
+    medians = []
+
+    if groups is None:
+        groups = range(len(store['groups']))
+    for group in groups:
+        abc,median = abc_data(store,group)
+        medians.append([[x] for x in median])
+        data.append(abc)
+
+    # data now contains one list member for each file of unit test fails, each with a triple list with A, B and C values
+    
+    for i,line,median in zip(groups,data,medians):    
+        X = [0] * len(line[0])
+        Y = [0] * len(line[0])
+        Z = [0] * len(line[0]) #The starting points of the vectors are always [0,0,0]
+        U = line[0]
+        V = line[1]
+        W = line[2]
+        
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
+        ax.quiver(X, Y, Z, U, V, W,arrow_length_ratio=0.1)
+        ax.set_xlim([min(U)-1, max(U)+1])
+        ax.set_ylim([min(V)-1, max(V)+1])
+        ax.set_zlim([min(W)-1, max(W)+1])
+
+        ax.set_xlabel('Assignment')
+        ax.set_ylabel('Branch')
+        ax.set_zlabel('Condition')
+
+        ax.set_title('Metric: ABC :: Round: ' + round + ' :: Fails: ' + str(store['fails'][i]) + ' :: Submissions: ' + str(len(line[0])) + '\nStarting point[0,0,0] = median vector: ' + str(median))
+        savefile = dir + '../../../plots/' + round + '/ABC_' + round + '_' + str(store['fails'][i])
+        plt.savefig(savefile)
+        plt.close()
+    
+
+#####
+# get_store(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Returns the columnar store of the round. The last one is kept, the jobs of one round mostly follow each other.
+
+_store = (None, None)
+
+def get_store(dir,round):
+    global _store
+    if _store[0] != (dir,round):
+        _store = ((dir,round), resultstore.load_store(dir,round))
+    return _store[1]
+
+#####
+# plot_jobs(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Returns the plots of one round as a list of jobs for plot_job. Every job draws into its own file.
+
+def plot_jobs(dir,round):
+    jobs = [('abc',dir,round,group) for group in range(len(get_store(dir,round)['groups']))]
+    jobs += [('histo',dir,round,metric,HISTO_BUCKETS) for metric in HISTO_METRICS]
+    jobs += [('overview',dir,round,metric,title) for metric,title in OVERVIEW_METRICS]
+    return jobs
+
+#####
+# plot_filename(job)
+#
+# job   : One job returned by plot_jobs
+#
+# Returns the name of the file the job draws
+
+def plot_filename(job):
+    kind,dir,round = job[:3]
+    if kind == 'abc':
+        name = 'ABC_' + round + '_' + str(get_store(dir,round)['fails'][job[3]])
+    elif kind == 'histo':
+        name = 'Overall_Histo_' + str(job[4]) + '_' + round + '_' + job[3]
+    else:
+        name = 'overall_' + round + '_' + job[4]
+    return dir + '/plots/' + round + '/' + name + '.png'
+
+#####
+# plot_fingerprint(job)
+#
+# job   : One job returned by plot_jobs
+#
+# Returns a fingerprint of everything the plot of the job depends on: the code drawing it, the job itself
+# (kind, round, fail group, metric, bucket count, title), the amounts of fails and the slice of the store it reads.
+
+_code_digest = None
+
+def plot_fingerprint(job):
+    global _code_digest
+    if _code_digest is None:
+        digest = hashlib.sha1(matplotlib.__version__.encode('utf-8'))
+        for module in [__file__, resultstore.__file__]:
+            with open(module, 'rb') as f:
+                digest.update(f.read())
+        _code_digest = digest.digest()
+
+    kind,dir,round = job[:3]
+    store = get_store(dir,round)
+    columns = store['columns']
+    fingerprint = hashlib.sha1(_code_digest)
+    fingerprint.update(repr((kind,round) + job[3:]).encode('utf-8'))
+    fingerprint.update(store['fails'].tobytes()) # Labels
+    if kind == 'abc':
+        rows = store['group'] == job[3]
+        for metric in ABC_METRICS:
+            fingerprint.update(store['values'][rows, columns[metric]].tobytes())
+            fingerprint.update(resultstore.group_stat(store,'median',metric)[job[3]].tobytes())
+    elif kind == 'histo':
+        fingerprint.update(len(store['groups']).to_bytes(4, 'little'))
+        fingerprint.update(store['group'].tobytes())
+        fingerprint.update(store['values'][:, columns[job[3]]].tobytes())
+    else:
+        fingerprint.update(store['stats'][:, :, columns[job[3]]].tobytes())
+    return fingerprint.hexdigest()
+
+#####
+# plot_job(job)
+#
+# job   : One job returned by plot_jobs
+#
+# Draws the plot of one job. Runs in the pool workers of plotter, which load the store of a round themselves.
+
+def plot_job(job):
+    kind,dir,round = job[:3]
+    store = get_store(dir,round)
+    dirname = dir + '/metrics/' + round + '/results/'
+
+    if kind == 'abc':
+        abc_plot(dirname,store,round,[job[3]])
+    elif kind == 'histo':
+        histo_plot(dirname,store,job[4],job[3],round)
+    else:
+        overview_plot(dir,overall_metric_data(store,job[3]),store['fails'],round,job[4])
+
+#####
+# plotter(dir,rounds,jobs,force)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# rounds: names of the rounds to plot, all rounds in the metric result directory if None
+# jobs  : how many processes draw the plots
+# force : draw all plots, even those that are up to date
+#
+# Plots everything in the whole Analyzer project. If you need more/different plots, add them here
+# With more than one job the plots of all rounds are drawn by a pool of processes, the file names don't depend on it.
+#
+# The fingerprint of every plot (see plot_fingerprint) is kept in plots/<round>/fingerprints.json. A plot is
+# only drawn again if its fingerprint changed or the file is missing. The fingerprints are saved once all
+# plots are drawn, so plots of an interrupted run are drawn again on the next go.
+# 
+
+def plotter(dir,rounds=None,jobs=1,force=False):
+    global _store
+    _store = (None, None) # The stores may have been rebuilt since the last call
+    plt.rcParams.update({'figure.max_open_warning': 0}) # Stop pyplot throwing warnings about too many open plots
+
+    if rounds is None:
+        rounds = os.listdir(dir + '/metrics') # Rounds of exercises in the metric result directory
+
+    print('Drawing plots for round: ')
+    queue = []
+    fingerprints = {}
+    skipped = 0
+    for round in rounds:
+        print('... ' + round)
+        Path(dir + '/plots/' + round ).mkdir(parents=True, exist_ok=True) # Create the plots - directory
+
+        old_fingerprints = load_fingerprints(dir,round)
+        fingerprints[round] = {}
+        for job in plot_jobs(dir,round):
+            name = os.path.basename(plot_filename(job))
+            fingerprints[round][name] = plot_fingerprint(job)
+            if not force and old_fingerprints.get(name) == fingerprints[round][name] and os.path.exists(plot_filename(job)):
+                skipped += 1 # Up to date
+                continue
+            queue.append(job)
+
+    if skipped:
+        print(str(skipped) + ' plots are up to date')
+    if jobs <= 1:
+        for job in queue:
+            plot_job(job)
+    else:
+        with mp.Pool(processes=jobs) as pool:
+            for _ in pool.imap_unordered(plot_job, queue):
+                pass
+
+    for round in rounds:
+        save_fingerprints(dir,round,fingerprints[round])
+
+#####
+# load_fingerprints(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Returns the plot fingerprints saved by the previous run, none if they can't be read
+
+def load_fingerprints(dir,round):
+    try:
+        with open(dir + '/plots/' + round + '/fingerprints.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+#####
+# save_fingerprints(dir,round,fingerprints)
+#
+# dir          : base directory of the whole data result package (/directory-analysis/)
+# round        : Name of the round
+# fingerprints : The fingerprints of the plots of the round, by file name
+
+def save_fingerprints(dir,round,fingerprints):
+    with open(dir + '/plots/' + round + '/fingerprints.json', 'w') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+###
+# main()
+#
+# Used for testing purposes during development. Analyzer calls plotter(dir) instead.
+#
+
+def main():
+
+    store = resultstore.load_store('datadump-analysis','mauno-plot')
+    abc_plot('datadump-analysis/metrics/mauno-plot/results',store,'mauno-plot')
+#    histo_plot('datadump-analysis/metrics/mauno-plot/results/',store,10,'cyclomatic_complexity','mauno-plot')
+    
+#    plotter('datadump-analysis')
+    
+
+#    dist = distribution('cyclomatic_complexity','mauno-plot/errors0result.txt')
+#    histogram_plot(dist,10,'cyclomatic_complexity','mauno-plot')
+
+#    dist = distribution('halstead_bugprop','errors0result.txt')
+#    histogram_plot(dist,10,'halstead_bugprop','rainfall')
+
+    
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,153 @@
+import json, os, re
+
+# numpy is only imported by the functions of the store itself. Writing and reading the results index
+# is part of grouping, which doesn't need numpy
+
+STATS = ['max','mean','median','min']
+
+#####
+# store_filename(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Returns the name of the columnar store of one round
+
+def store_filename(dir,round):
+    return dir + '/metrics/' + round + '/columns.npz'
+
+#####
+# write_index(dir,round,tests,groups)
+#
+# dir    : base directory of the whole data result package (/directory-analysis/)
+# round  : Name of the round
+# tests  : Number of unit tests of the round
+# groups : The fail groups of the round as dicts of fails (number of failed tests), filelist, results
+#          (file names relative to the round's metrics directory) and submissions (number of submissions)
+#
+# Writes the results index of one round, metrics/<round>/index.json. It maps the number of failed tests to the
+# files of the fail group, so nothing has to guess the number of fails from the order of files in a directory.
+# Fail groups without submissions have no files and are not in the index.
+
+def write_index(dir,round,tests,groups):
+    with open(dir + '/metrics/' + round + '/index.json', 'w') as f:
+        json.dump({'round': round, 'tests': tests, 'groups': sorted(groups, key=lambda x: x['fails'])}, f, indent=2)
+
+#####
+# load_index(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Returns the results index of one round, see write_index. Results written before there were indices
+# get one made up from the names of the result files.
+
+def load_index(dir,round):
+    try:
+        with open(dir + '/metrics/' + round + '/index.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    groups = []
+    for filename in os.listdir(dir + '/metrics/' + round + '/results/'):
+        match = re.fullmatch(re.escape(round) + r'-fails-(\d+)-results\.json', filename)
+        if match:
+            groups.append({'fails': int(match.group(1)), 'results': 'results/' + filename})
+    return {'round': round, 'groups': sorted(groups, key=lambda x: x['fails'])}
+
+#####
+# build_store(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Collects the multimetric results of all fail groups of one round into one columnar store, so the plots
+# don't have to parse the result files again and again. The store holds
+#   metrics : names of the metrics, one column each
+#   groups  : names of the result files, ordered by the number of failed tests
+#   fails   : the number of failed tests of every group
+#   values  : one row per submission and one column per metric, NaN where a submission has no value
+#   group   : index into groups for every row of values
+#   stats   : the stats of every group, indexed [group, STATS, metric]
+# Every result file is parsed once. The store is written to a temporary file first and then moved into place.
+
+def build_store(dir,round):
+    import numpy as np
+    index = load_index(dir,round)['groups']
+    groups = [os.path.basename(group['results']) for group in index]
+    metrics = {} # metric name -> column, in the order of appearance
+    rows, group_index, group_stats = [], [], []
+
+    for i,group in enumerate(index):
+        with open(dir + '/metrics/' + round + '/' + group['results'], 'r') as f:
+            data = json.load(f)
+        for values in data['files'].values():
+            row = {}
+            for metric,value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    row[metrics.setdefault(metric, len(metrics))] = value
+            rows.append(row)
+            group_index.append(i)
+        group_stats.append(data.get('stats', {}))
+
+    values = np.full((len(rows), len(metrics)), np.nan)
+    for i,row in enumerate(rows):
+        for column,value in row.items():
+            values[i, column] = value
+    stats = np.full((len(groups), len(STATS), len(metrics)), np.nan)
+    for i,group in enumerate(group_stats):
+        for j,stat in enumerate(STATS):
+            for metric,value in group.get(stat, {}).items():
+                if metric in metrics:
+                    stats[i, j, metrics[metric]] = value
+
+    storefile = store_filename(dir,round)
+    with open(storefile + '.tmp', 'wb') as f:
+        np.savez(f, metrics=np.array(list(metrics), dtype=str), groups=np.array(groups, dtype=str),
+                 fails=np.array([group['fails'] for group in index], dtype=np.int32),
+                 values=values, group=np.array(group_index, dtype=np.int32), stats=stats)
+    os.replace(storefile + '.tmp', storefile)
+
+#####
+# load_store(dir,round)
+#
+# dir   : base directory of the whole data result package (/directory-analysis/)
+# round : Name of the round
+#
+# Loads the columnar store of one round into a dict of arrays, see build_store. Builds the store first
+# if there is none, e.g. for results written before stores existed.
+
+def load_store(dir,round):
+    import numpy as np
+    if not os.path.exists(store_filename(dir,round)):
+        build_store(dir,round)
+    with np.load(store_filename(dir,round)) as f:
+        store = {key: f[key] for key in f.files}
+    store['columns'] = {metric: i for i,metric in enumerate(store['metrics'].tolist())}
+    return store
+
+#####
+# column(store,metric,group)
+#
+# store  : A store returned by load_store
+# metric : Name of the metric
+# group  : Index of the fail group in store['groups']
+#
+# Returns the values of metric for all submissions of one fail group, without the missing ones
+
+def column(store,metric,group):
+    import numpy as np
+    values = store['values'][store['group'] == group, store['columns'][metric]]
+    return values[~np.isnan(values)]
+
+#####
+# group_stat(store,stat,metric)
+#
+# store  : A store returned by load_store
+# stat   : One of STATS
+# metric : Name of the metric
+#
+# Returns the stat of metric for every fail group, in the order of store['groups']
+
+def group_stat(store,stat,metric):
+    return store['stats'][:, STATS.index(stat), store['columns'][metric]]
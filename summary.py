@@ -0,0 +1,102 @@
+import csv, json
+from openpyxl import Workbook
+
+# The fields of a summary record written by grouper.grouper, with their labels in the Excel sheet and
+# what their percentage is relative to, if anything
+FIELDS = [
+    ('total', 'Total Submissions', None, None),
+    ('first', 'User First Submissions', None, None),
+    ('perfect_first', 'Perfect First Submissions', 'first', '% of unique users'),
+    ('perfect', 'Total Perfect Submissions', 'total', '% of total submissions'),
+    ('perfect_unique', 'Perfect unique submissions', 'first', '% of unique users'),
+    ('imperfect', 'Imperfect Final submissions', 'first', '% of unique users'),
+]
+
+EXPLANATIONS = [
+    ('Round', 'The name of the round of exercises'),
+    ('Unit Tests', 'How many unit tests were run on that round of exercises'),
+    ('Total', 'Total amount of submissions for that round'),
+    ('User First', 'The amount of unique users who submitted at least once'),
+    ('Perfect First', 'Amount of users who submitted a version with no unit test fails on their first submit'),
+    ('Perfect', 'Amount of submissions with no errors. May contain multiples by the same user'),
+    ('Perfect Unique', 'The amount of users who submitted a solution with no errors at least once'),
+    ('Imperfect', 'The amount of users who did not submit a solution with no errors'),
+    ('Submissions per User', 'Average amount of submissions by one user, and the most submissions by a single user'),
+]
+
+#####
+# percent(record,field,of)
+#
+# record : A summary record
+# field  : The field to express as a percentage
+# of     : The field it is a percentage of
+#
+# Returns the percentage, None if there is nothing to relate to
+
+def percent(record,field,of):
+    if not record[of]:
+        return None
+    return record[field]/record[of] *100
+
+#####
+# table(summaries)
+#
+# summaries : The summary records of all rounds
+#
+# Returns the summaries as a table with one row per round, for the CSV and JSON copies
+
+def table(summaries):
+    rows = []
+    for record in summaries:
+        row = {'round': record['round'], 'tests': record['tests']}
+        for field,label,of,explanation in FIELDS:
+            row[field] = record[field]
+            if of:
+                row[field + '_percent'] = percent(record,field,of)
+        row['submissions_per_user'] = record['submissions_per_user']
+        row['max_submissions_per_user'] = record['max_submissions_per_user']
+        rows.append(row)
+    return rows
+
+#####
+# write_summary(dir,summaries)
+#
+# dir       : The analysis directory (<directory>-analysis)
+# summaries : The summary records returned by grouper.grouper, one per round in the order the rounds were grouped
+#
+# Writes the submission summary of all rounds at once: Subdata.xlsx for reading, with the most recently grouped round
+# on top and the explanation of the fields below, and Subdata.csv and Subdata.json with the same numbers,
+# one row per round. The workbook is built in openpyxl's write-only mode, row by row.
+
+def write_summary(dir,summaries):
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    sheet.column_dimensions['A'].width = 32
+    sheet.column_dimensions['D'].width = 20
+    sheet.freeze_panes = 'A3' # Freeze the title row for viewing convenience
+
+    sheet.append(['Overall Submission data'])
+    sheet.append(['Metric','Amount','Percent','% Explanation'])
+    for record in reversed(summaries):
+        sheet.append(['Round: ' + record['round'], 'Unit Tests: ' + str(record['tests'])])
+        for field,label,of,explanation in FIELDS:
+            if of:
+                sheet.append([label, record[field], percent(record,field,of), explanation])
+            else:
+                sheet.append([label, record[field]])
+        sheet.append(['Submissions per user', record['submissions_per_user'], None,
+                      'at most ' + str(record['max_submissions_per_user']) + ' by one user'])
+        sheet.append([])
+
+    sheet.append(['Explanation of the fields in this document'])
+    for field,explanation in EXPLANATIONS:
+        sheet.append([field, explanation])
+    wb.save(dir + '/Subdata.xlsx')
+
+    rows = table(summaries)
+    with open(dir + '/Subdata.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['round'])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(dir + '/Subdata.json', 'w') as f:
+        json.dump(rows, f, indent=2)
@@ -0,0 +1,63 @@
+from multimetric.cls.cache import cache_from_args
+from multimetric.multimetric import ArgParser, file_process
+
+CONTENT = b"def f(x):\n    if x and x > 1:\n        return [y for y in range(x) if y]\n    return 0\n"
+
+
+def _args(tmp_path, *argv):
+    return ArgParser(["--cache-dir", str(tmp_path)] + list(argv))
+
+
+def _key(tmp_path, *argv):
+    return cache_from_args(_args(tmp_path, *argv)).key(CONTENT, "Python")
+
+
+def test_same_options_same_key(tmp_path):
+    assert _key(tmp_path) == _key(tmp_path)
+
+
+def test_options_change_key(tmp_path):
+    _default = _key(tmp_path)
+    for argv in (["--engine", "ast"], ["--detect-limit", "16"], ["--scope-depth", "2"],
+                 ["--bugpredict", "old"], ["--maintindex", "sei"]):
+        assert _key(tmp_path, *argv) != _default, argv
+
+
+def test_content_and_language_change_key(tmp_path):
+    _cache = cache_from_args(_args(tmp_path))
+    assert _cache.key(CONTENT, "Python") != _cache.key(CONTENT + b"\n", "Python")
+    assert _cache.key(CONTENT, "Python") != _cache.key(CONTENT, "C")
+
+
+def test_disabled(tmp_path):
+    assert cache_from_args(_args(tmp_path, "--no-cache")) is None
+    _args_dump = _args(tmp_path)
+    _args_dump.dump = True
+    assert cache_from_args(_args_dump) is None
+
+
+def test_engine_not_served_from_cache(tmp_path):
+    _tokens = file_process("a.py", _args(tmp_path), {}, _content=CONTENT)
+    _ast = file_process("a.py", _args(tmp_path, "--engine", "ast"), {}, _content=CONTENT)
+    _cold = file_process("a.py", _args(tmp_path / "cold", "--engine", "ast"), {}, _content=CONTENT)
+    assert _tokens[0]["engine"] == "tokens"
+    assert _ast[0] == _cold[0]
+    assert _ast[0]["engine"] == "ast"
+
+
+def test_cached_result_reused(tmp_path):
+    _first = file_process("a.py", _args(tmp_path), {}, _content=CONTENT)
+    _second = file_process("b.py", _args(tmp_path), {}, _content=CONTENT)
+    assert _first[0] == _second[0]
+    assert _first[3] == _second[3]
+
+
+def test_versions_change_key(tmp_path, monkeypatch):
+    import platform
+    import pygments
+    _default = _key(tmp_path)
+    monkeypatch.setattr(pygments, "__version__", "0.0")
+    _pygments = _key(tmp_path)
+    monkeypatch.setattr(platform, "python_version", lambda: "2.7.18")
+    _python = _key(tmp_path)
+    assert len({_default, _pygments, _python}) == 3
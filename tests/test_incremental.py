@@ -0,0 +1,92 @@
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+import analyzer
+import multimetric.multimetric as mm
+
+SOURCE = "def f{0}(x):\n    if x > {0}:\n        return x * {0}\n    return 0\n"
+
+
+def _datadump(tmp_path):
+    # One round of 8 submissions by 4 users, with 0 to 2 failed tests out of 2
+    _dir = tmp_path / "datadump"
+    (_dir / "round1").mkdir(parents=True)
+    rows = ["Time,UserID,Status,Grade,filename,Unittest"]
+    for i in range(8):
+        (_dir / "round1" / "sub{}.py".format(i)).write_text(SOURCE.format(i))
+        rows.append("{0},u{1},ok,1,round1/sub{0}.py,{2}".format(i, i % 4, ["..", ".F", "EF"][i % 3]))
+    (_dir / "round1.csv").write_text("\n".join(rows) + "\n")
+    return _dir
+
+
+def _run(monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, "argv", ["analyzer.py", "datadump", "--jobs", "1", "--plot-jobs", "1", "--no-cache"] + list(argv))
+    analyzer.main()
+    return capsys.readouterr().out
+
+
+def _results(tmp_path):
+    res = {}
+    for x in glob.glob(str(tmp_path / "datadump-analysis" / "metrics" / "*" / "results" / "*")):
+        with open(x, encoding="utf-8") as f:
+            res[os.path.basename(x)] = json.load(f)
+    return res
+
+
+def _submission(results, name):
+    for r in results.values():
+        for x, v in r["files"].items():
+            if os.path.basename(x) == name:
+                return v
+    return None
+
+
+def test_rerun_after_interrupt(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _dir = _datadump(tmp_path)
+    assert "Calculating metrics for 3 fail groups" in _run(monkeypatch, capsys)
+    assert "Calculating metrics for 0 fail groups" in _run(monkeypatch, capsys, "--incremental")
+    _before = _submission(_results(tmp_path), "sub1.py")
+
+    # A submission changes and the next full run is interrupted after a few files
+    (_dir / "round1" / "sub1.py").write_text(SOURCE.format(1) + SOURCE.format(99))
+    _process = mm.file_process
+    _calls = []
+
+    def _interrupted(*args, **kwargs):
+        _calls.append(args[0])
+        if len(_calls) > 3:
+            raise KeyboardInterrupt()
+        return _process(*args, **kwargs)
+
+    monkeypatch.setattr(mm, "file_process", _interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        _run(monkeypatch, capsys)
+    monkeypatch.setattr(mm, "file_process", _process)
+
+    # Nothing truncated or half written is left behind
+    assert not glob.glob(str(tmp_path / "datadump-analysis" / "metrics" / "*" / "results" / "*.tmp"))
+    assert len(_results(tmp_path)) == 3
+
+    # The group of the changed submission is calculated again, and the results are those of a full run
+    _out = _run(monkeypatch, capsys, "--incremental")
+    assert "Calculating metrics for 0 fail groups" not in _out
+    _incremental = _results(tmp_path)
+    _run(monkeypatch, capsys)
+    assert _incremental == _results(tmp_path)
+    assert _submission(_incremental, "sub1.py") != _before
+
+
+def test_engine_switch(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _datadump(tmp_path)
+    _run(monkeypatch, capsys)
+    assert "Calculating metrics for 3 fail groups" in _run(monkeypatch, capsys, "--incremental", "--engine", "ast")
+    assert _submission(_results(tmp_path), "sub1.py")["engine"] == "ast"
+    assert "Calculating metrics for 0 fail groups" in _run(monkeypatch, capsys, "--incremental", "--engine", "ast")
+    assert "Calculating metrics for 3 fail groups" in _run(monkeypatch, capsys, "--incremental")
+    assert _submission(_results(tmp_path), "sub1.py")["engine"] == "tokens"
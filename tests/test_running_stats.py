@@ -0,0 +1,64 @@
+import random
+import statistics
+
+import pytest
+
+from multimetric.cls.stats.running import PERCENTILES, P2Quantile, RunningStats
+
+
+def _exact(values):
+    _quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    res = {"mean": statistics.fmean(values), "min": min(values), "max": max(values),
+           "sd": statistics.stdev(values)}
+    for p in PERCENTILES:
+        res["p{}".format(p)] = _quantiles[p - 1]
+    return res
+
+
+def _random(seed, count, draw):
+    _rng = random.Random(seed)
+    return [draw(_rng) for _ in range(count)]
+
+
+def _running(values, exact=True):
+    _stats = RunningStats(exact)
+    for x in values:
+        _stats.add(x)
+    return _stats.get_results()
+
+
+@pytest.mark.parametrize("values", [
+    [3, 1, 2],
+    [5, 5, 5, 5],
+    [0.1 * x for x in range(1, 101)],
+    _random(1, 1000, lambda x: x.gauss(1e6, 1.0)),
+    _random(2, 777, lambda x: x.randint(0, 50)),
+])
+def test_exact(values):
+    _res = _running(values)
+    for k, v in _exact(values).items():
+        assert _res[k] == pytest.approx(v, rel=1e-9, abs=1e-9), k
+
+
+def test_few_values():
+    assert _running([4]) == {"mean": 4.0, "min": 4, "max": 4, **{"p{}".format(p): 4.0 for p in PERCENTILES}}
+    _res = _running([1, 3])
+    assert _res["sd"] == pytest.approx(2 ** 0.5)
+    assert _res["p50"] == 2.0
+
+
+def test_approx_percentiles():
+    _values = _random(3, 20000, lambda x: x.uniform(0, 100))
+    _res = _running(_values, exact=False)
+    _ref = _exact(_values)
+    for k in ("mean", "min", "max", "sd"):
+        assert _res[k] == pytest.approx(_ref[k], rel=1e-9), k
+    for p in PERCENTILES:
+        assert _res["p{}".format(p)] == pytest.approx(_ref["p{}".format(p)], abs=0.25), p
+
+
+def test_p2_small_series_exact():
+    _quantile = P2Quantile(0.5)
+    for x in [9, 1, 5]:
+        _quantile.add(x)
+    assert _quantile.get() == 5
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+
+import pytest
+
+from multimetric.cls.writer import JsonResultWriter
+from multimetric.multimetric import MetricSession, ResultFiles
+
+RESULT = {
+    "files": {
+        "/data/round1/sub0.py": {"loc": 12, "comment_ratio": 8.333333333333334, "lang": ["Python"],
+                                 "encoding": "utf-8", "scopes": {"f": {"line": 1, "abc": [1, 2, 3.0]}}},
+        "/data/round1/päivä \"1\"\n.py": {"loc": 0, "empty": {}, "none": None, "flag": True, "list": []},
+    },
+    "overall": {"loc": 12, "operators_sum": 7.5, "lang": ["Python"]},
+    "stats": {"mean": {"loc": 6.0}, "max": {"loc": 12}, "min": {"loc": 0}},
+}
+
+
+def _write(result, indent):
+    out = io.StringIO()
+    writer = JsonResultWriter(out, indent)
+    for k, v in result["files"].items():
+        writer.add_file(k, v)
+    writer.close({k: v for k, v in result.items() if k != "files"})
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("indent", [None, 0, 1, 2, 4])
+def test_matches_json_dumps(indent):
+    assert _write(RESULT, indent) == json.dumps(RESULT, ensure_ascii=False, indent=indent)
+
+
+@pytest.mark.parametrize("indent", [None, 0, 2])
+def test_no_files(indent):
+    _result = {"files": {}, "overall": {}}
+    assert _write(_result, indent) == json.dumps(_result, ensure_ascii=False, indent=indent)
+
+
+def test_result_files_bounded(tmp_path):
+    _files = ResultFiles(max_open=2)
+    _paths = [str(tmp_path / "group{}.json".format(i)) for i in range(5)]
+    _outputs = [_files.output(x) for x in _paths]
+    for i in range(20):
+        _outputs[i % 5].write(str(i) + ",")
+    for x in _paths:
+        assert not os.path.exists(x)
+    for x in _paths:
+        _files.commit(x)
+    for i, x in enumerate(_paths):
+        with open(x, encoding="utf-8") as f:
+            assert f.read() == "".join(str(j) + "," for j in range(i, 20, 5))
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(x) for x in _paths)
+
+
+def test_result_files_discard(tmp_path):
+    _files = ResultFiles()
+    _path = str(tmp_path / "group.json")
+    _files.output(_path).write("{")
+    _files.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_groups_matches_analyze_groups(tmp_path):
+    _a = ("a.py", b"def f(x):\n    if x and x > 1:\n        return x + 1\n    return 0\n")
+    _b = ("b.py", b"y = [1, 2]\n")
+    _groups = {"g": [_a, _b, _a], "h": [_b, _a], "empty": []}
+    with MetricSession(no_cache=True) as session:
+        _expected = session.analyze_groups(_groups)
+        _outputs = {k: io.StringIO() for k in _groups}
+        session.write_groups(_groups, _outputs, 2)
+    for k, v in _outputs.items():
+        _written = json.loads(v.getvalue())
+        _result = json.loads(json.dumps(_expected[k]))
+        assert _written["files"] == _result["files"], k
+        # Processed largest first, but written in the order of the group
+        assert list(_written["files"]) == list(dict.fromkeys(x[0] for x in _groups[k])), k
+        assert _written["overall"] == _result["overall"], k
+        # The stats may be summed up in another order
+        for _stat, _values in _result["stats"].items():
+            assert _written["stats"][_stat] == pytest.approx(_values, rel=1e-12), (k, _stat)